@@ -1,14 +1,108 @@
 import mesa
-import math
-import random
 from collections import deque
+from conditions import (
+    EMPTY, FINE, ON_FIRE, BURNED_OUT, FIRE_OFF, BOMBED, CUT, CITY, EVACUATED, ALIVE, DEAD, AERIAL, RAIN, TREE, GRASS,
+    CONDITION_NAMES, CONDITION_CODES,
+)
 
 
-class TreeCell(mesa.Agent):
+class CodedAgent:
+    """
+    Base de todos os agentes do modelo, com __slots__ e a condição guardada como código inteiro.
+
+    `code` é o código de `conditions` e é o que as regras comparam; `condition`
+    dá e recebe o nome ("Fine", "On Fire", ...) para a visualização e o código externo.
+    O mesa.Agent não declara __slots__, então herdar dele daria um __dict__ a cada
+    agente; os métodos dele são reaproveitados aqui e os agentes continuam sendo
+    registrados no modelo, no grid e no schedule como antes.
+    """
+    __slots__ = ("unique_id", "model", "pos", "code", "__weakref__")
+
+    def __init__(self, unique_id, model):
+        self.code = EMPTY
+        mesa.Agent.__init__(self, unique_id, model)
+
+    remove = mesa.Agent.remove
+    step = mesa.Agent.step
+    advance = mesa.Agent.advance
+    random = mesa.Agent.random
+
+    @property
+    def condition(self):
+        return CONDITION_NAMES[self.code]
+
+    @condition.setter
+    def condition(self, nome):
+        self.code = CONDITION_CODES[nome]
+
+
+class LandscapeCell(CodedAgent):
+    """
+    Base das células fixas da paisagem (árvore, cidade e grama).
+    Avisa o modelo sempre que a condição da célula muda.
+    """
+    __slots__ = ()
+
+    @property
+    def condition(self):
+        return CONDITION_NAMES[self.code]
+
+    @condition.setter
+    def condition(self, nome):
+        self.set_code(CONDITION_CODES[nome])
+
+    def set_code(self, nova):
+        """Muda a condição pelo código e avisa o modelo (a antiga é EMPTY na primeira vez)."""
+        antiga = self.code
+        self.code = nova
+        if nova != antiga:
+            aviso = getattr(self.model, "condition_changed", None)
+            if aviso is not None:
+                aviso(self, antiga, nova)
+
+
+class ArrayCell(LandscapeCell):
+    """
+    Célula da paisagem guardada nos arrays do modelo (`vegetation`, `condition`, `survival`).
+
+    O objeto é só uma visão da célula: `code` lê e escreve model.condition[pos].
+    As visões não são registradas no mesa; a grade (LandscapeGrid) as cria quando
+    alguém pede os agentes de uma célula e as reaproveita enquanto estiverem em uso.
+    """
+    __slots__ = ()
+
+    def __init__(self, pos, model, vegetation):
+        """Coloca uma nova célula nos arrays do modelo, no lugar do que houver em pos."""
+        self.unique_id = pos
+        self.model = model
+        self.pos = pos
+        model.vegetation[pos] = vegetation
+        model.grid.proxies[pos] = self
+
+    @classmethod
+    def view(cls, model, pos):
+        """Visão de uma célula que já está nos arrays do modelo."""
+        cell = cls.__new__(cls)
+        cell.unique_id = pos
+        cell.model = model
+        cell.pos = pos
+        return cell
+
+    @property
+    def code(self):
+        return self.model.condition.item(self.pos)
+
+    @code.setter
+    def code(self, nova):
+        self.model.condition[self.pos] = nova
+
+
+class TreeCell(ArrayCell):
     """
     A tree in the forest.
     A árvore da floresta, com a probabilidade de sobrevivência e influência do vento.
     """
+    __slots__ = ()
 
     def __init__(self, pos, model, prob_de_sobrevivencia):
         """
@@ -18,12 +112,20 @@ class TreeCell(mesa.Agent):
             model: Referência do modelo padrão para o agente.
             prob_de_sobrevivencia: Probabilidade de a árvore sobreviver ao fogo.
         """
-        super().__init__(pos, model)
+        super().__init__(pos, model, TREE)
         self.pos = pos
         self.model = model
-        self.condition = "Fine"  # Possíveis condições: "Fine", "On Fire", "Burned Out"
+        self.set_code(FINE)  # Possíveis condições: "Fine", "On Fire", "Burned Out"
         self.prob_de_sobrevivencia = prob_de_sobrevivencia  # Atributo de probabilidade de sobrevivência
 
+    @property
+    def prob_de_sobrevivencia(self):
+        return self.model.survival.item(self.pos)
+
+    @prob_de_sobrevivencia.setter
+    def prob_de_sobrevivencia(self, prob):
+        self.model.survival[self.pos] = prob
+
     def ajusta_probabilidade_por_vento(self, neighbor_pos):
         """
         Ajusta a probabilidade de sobrevivência com base na direção do vento.
@@ -58,9 +160,9 @@ class TreeCell(mesa.Agent):
         """
         Se a árvore estiver pegando fogo, espalha-o para árvores próximas, considerando o vento.
         """
-        if self.condition == "On Fire":
+        if self.code == ON_FIRE:
             for neighbor in self.model.grid.get_neighbors(self.pos, moore=True, include_center=False):
-                if neighbor.condition == "Fine":
+                if neighbor.code == FINE:
                     # Ajustar a probabilidade com base no vento
                     probabilidade_ajustada = neighbor.ajusta_probabilidade_por_vento(self.pos)
                     
@@ -68,9 +170,9 @@ class TreeCell(mesa.Agent):
                     random_value = self.random.random()
 
                     if random_value > probabilidade_ajustada:
-                        neighbor.condition = "On Fire"
+                        neighbor.set_code(ON_FIRE)
             # Alterar a condição da árvore para "Burned Out"
-            self.condition = "Burned Out"
+            self.set_code(BURNED_OUT)
         else:
             print(f"Tree at {self.pos} is in state: {self.condition}")
 
@@ -81,35 +183,23 @@ class TreeCell(mesa.Agent):
         x, y = pos
         return 0 <= x < self.model.grid.width and 0 <= y < self.model.grid.height
 
-class CityCell(mesa.Agent):
+class CityCell(LandscapeCell):
     """
     A cidade na floresta, com alerta de evacuação baseado no fogo.
     """
+    __slots__ = ("alert",)
 
     def __init__(self, pos, model, condition="City"):
         super().__init__(pos, model)
         self.pos = pos
-        self.condition = "City"  # Condições possíveis: "City", "Evacuated"
+        self.set_code(CITY)  # Condições possíveis: "City", "Evacuated"
         self.alert = False  # Flag para indicar o alerta de evacuação
 
     def step(self):
-        # Alerta de evacuação para as cidades dentro do raio de 10 células
-        if self.condition == "City":
-            for x in range(self.pos[0] - 10, self.pos[0] + 11):
-                for y in range(self.pos[1] - 10, self.pos[1] + 11):
-                    # Ignorar a célula da cidade ou fora dos limites
-                    if (x, y) == self.pos or not (0 <= x < self.model.grid.width and 0 <= y < self.model.grid.height):
-                        continue
-                    # Calcular a distância entre as células
-                    distance = math.sqrt((self.pos[0] - x) ** 2 + (self.pos[1] - y) ** 2)
-                    # Se o fogo está dentro do raio e encontrou uma célula em chamas, evacuar
-                    if distance <= 10:
-                        neighbor = self.model.grid.get_cell_list_contents([(x, y)])
-                        for n in neighbor:
-                            if n.condition == "On Fire":
-                                self.alert = True
-                                self.condition = "Evacuated"  # Evacuar a cidade
-                                return
+        # Alerta de evacuação se houver fogo dentro do raio de evacuação do modelo (10 células por padrão)
+        if self.code == CITY and self.model.fire_near(self.pos):
+            self.alert = True
+            self.set_code(EVACUATED)  # Evacuar a cidade
 
     def in_bounds(self, pos):
         """
@@ -118,76 +208,64 @@ class CityCell(mesa.Agent):
         x, y = pos
         return 0 <= x < self.model.grid.width and 0 <= y < self.model.grid.height
 
-class GrassCell(mesa.Agent):
+class GrassCell(ArrayCell):
+    __slots__ = ()
+
     def __init__(self, pos, model):
-        super().__init__(pos, model)
+        super().__init__(pos, model, GRASS)
         self.pos = pos
-        self.condition = "Fine"  # "Fine", "On Fire", "Burned Out"
+        self.set_code(FINE)  # "Fine", "On Fire", "Burned Out"
 
     def ajusta_probabilidade_por_vento(self, neighbor_pos):
         #funçao nao utilizada diretamente, apenas para o codigo rodar        
         return 0.1
     def step(self):
-            if self.condition == "On Fire":
+            if self.code == ON_FIRE:
                 for neighbor in self.model.grid.get_neighbors(self.pos, moore=True, include_center=False):
-                    if neighbor.condition == "Fine" :
+                    if neighbor.code == FINE :
                         if self.random.random() < 0.15:    #prob. arbitraria para queimar os vizinhos
-                            neighbor.condition = "On Fire"
-                self.condition = "Burned Out"
+                            neighbor.set_code(ON_FIRE)
+                self.set_code(BURNED_OUT)
 
-class Person(mesa.Agent):
+class Person(CodedAgent):
     """Classe base para as pessoas na simulação."""
+    __slots__ = ("fire_resistance", "smoke_resistance")
+
     def __init__(self, pos, model, resistencia_fogo=0, resistencia_fumaca=0.5):
         super().__init__(pos, model)
         self.pos = pos
-        self.condition = "Alive"
+        self.code = ALIVE
         self.fire_resistance = resistencia_fogo
         self.smoke_resistance = resistencia_fumaca
 
     def step(self):
         """Atualiza o estado da pessoa, verificando os perigos do fogo."""
-        if self.condition == "Alive":
+        if self.code == ALIVE:
             current_cell = self.model.grid.get_cell_list_contents([self.pos])
 
             # Verifica se a célula atual tem fogo
-            if any(agent.condition in ["On Fire", "Burned Out"] for agent in current_cell):
+            if any(agent.code == ON_FIRE or agent.code == BURNED_OUT for agent in current_cell):
                 if self.random.random() > self.fire_resistance:
-                    self.condition = "Dead"
+                    self.code = DEAD
                     return
 
             # Verifica os vizinhos para risco de fumaça
             for neighbor in self.model.grid.iter_neighbors(self.pos, moore=True):
-                if isinstance(neighbor, TreeCell) and neighbor.condition == "On Fire":
+                if isinstance(neighbor, TreeCell) and neighbor.code == ON_FIRE:
                     if self.random.random() > self.smoke_resistance:
-                        self.condition = "Dead"
+                        self.code = DEAD
                         break
 
 class GroundFirefighter(Person):
     """Representa um bombeiro terrestre."""
+    __slots__ = ("target_pos",)
+
     def __init__(self, pos, model, resistencia_fogo=1, resistencia_fumaca=1):
         super().__init__(pos, model, resistencia_fogo, resistencia_fumaca)
 
     def find_path_to_fire(self, start_pos):
-        """Busca em largura (BFS) para encontrar o menor caminho até o fogo."""
-        queue = deque([start_pos])  # Fila de posições a explorar
-        visited = set()  # Conjunto de posições visitadas
-
-        while queue:
-            current_pos = queue.popleft()
-            if current_pos in visited:
-                continue
-            visited.add(current_pos)
-
-            # Verifica os agentes na célula
-            cell_contents = self.model.grid.get_cell_list_contents([current_pos])
-            if any(isinstance(agent, TreeCell) and agent.condition == "On Fire" for agent in cell_contents):
-                return current_pos
-
-            # Adiciona vizinhos à fila
-            neighbors = self.model.grid.get_neighborhood(current_pos, moore=True, include_center=False)
-            queue.extend(neighbor for neighbor in neighbors if neighbor not in visited)
-
-        return None  # Retorna None se nenhum fogo for encontrado
+        """Consulta o índice espacial das árvores em chamas do modelo para achar o fogo mais próximo."""
+        return self.model.nearest_fire(start_pos)
 
     def step(self):
         """Move o bombeiro em direção ao fogo e apaga-o se estiver na mesma célula."""
@@ -217,12 +295,13 @@ class GroundFirefighter(Person):
         current_cell = self.model.grid.get_cell_list_contents([self.pos])
         tree = next((obj for obj in current_cell if isinstance(obj, TreeCell)), None)
 
-        if tree and tree.condition == "On Fire":
-            tree.condition = "Fire Off"  # Apaga o fogo
+        if tree and tree.code == ON_FIRE:
+            tree.set_code(FIRE_OFF)  # Apaga o fogo
             self.target_pos = None  # Reseta o alvo após apagar o fogo
 
-class AerialFirefighter(mesa.Agent):
+class AerialFirefighter(CodedAgent):
     """Representa um bombeiro aéreo que se move rapidamente e apaga o fogo na célula atual e vizinhas."""
+    __slots__ = ("velocidade", "target_pos")
 
     def __init__(self, pos, model, velocidade=3):
         """
@@ -234,7 +313,7 @@ class AerialFirefighter(mesa.Agent):
         """
         super().__init__(pos, model)
         self.velocidade = velocidade  # Velocidade de movimentação
-        self.condition = "Aerial"          # Tipo do agente (bombeiro aéreo)
+        self.code = AERIAL          # Tipo do agente (bombeiro aéreo)
 
     def apagar_fogo(self, pos):
         """
@@ -247,36 +326,19 @@ class AerialFirefighter(mesa.Agent):
         for cell in area_alvo:
             cell_contents = self.model.grid.get_cell_list_contents([cell])
             for agent in cell_contents:
-                if isinstance(agent, TreeCell) and agent.condition == "On Fire":
-                    agent.condition = "Fire Off"  # Apaga o fogo
+                if isinstance(agent, TreeCell) and agent.code == ON_FIRE:
+                    agent.set_code(FIRE_OFF)  # Apaga o fogo
 
     def find_path_to_fire(self, start_pos):
         """
-        Busca em largura (BFS) para encontrar o menor caminho até o fogo.
+        Encontra a árvore em chamas mais próxima no índice espacial do modelo.
         Args:
             start_pos: Posição inicial do bombeiro.
         Returns:
             A posição de uma célula com fogo ou `None` se não houver fogo.
         """
-        queue = deque([start_pos])  # Fila de posições a explorar
-        visited = set()            # Conjunto de posições visitadas
-
-        while queue:
-            current_pos = queue.popleft()
-            if current_pos in visited:
-                continue
-            visited.add(current_pos)
-
-            # Verifica os agentes na célula
-            cell_contents = self.model.grid.get_cell_list_contents([current_pos])
-            if any(isinstance(agent, TreeCell) and agent.condition == "On Fire" for agent in cell_contents):
-                return current_pos
-
-            # Adiciona vizinhos à fila
-            neighbors = self.model.grid.get_neighborhood(current_pos, moore=True, include_center=False)
-            queue.extend(neighbor for neighbor in neighbors if neighbor not in visited)
-
-        return None  # Retorna None se nenhum fogo for encontrado
+        # O índice (model.fire_index) acompanha as ignições e os fogos apagados; a busca olha só os baldes próximos
+        return self.model.nearest_fire(start_pos)
 
     def step(self):
         """
@@ -311,6 +373,8 @@ class Police(Person):
     Representa o agente Police (Policial).
     A Police captura Loggers ou Bombardeiros dentro de seu raio de visão.
     """
+    __slots__ = ("range_view", "speed", "target_path")
+
     def __init__(self, pos, model, range_view=3, speed=2):
         """
         Inicializa o Police.
@@ -324,7 +388,7 @@ class Police(Person):
         super().__init__(pos, model)
         self.range_view = range_view  # Raio de visão para capturar alvos
         self.speed = speed  # Velocidade de movimento (células por passo)
-        self.target_path = []  # Caminho até o próximo Bombardeiro ou Logger
+        self.target_path = deque()  # Caminho até o próximo Bombardeiro ou Logger
 
     def step(self):
         """
@@ -333,11 +397,14 @@ class Police(Person):
         """
         if not self.target_path:
             # Se não tem caminho, encontra um novo caminho até o alvo mais próximo (Bombardeiro ou Logger)
-            self.target_path = self.find_path_to_target(self.pos)
+            if self.model.police_field is not None:
+                self.target_path = self.model.path_to_criminal(self.pos)
+            else:
+                self.target_path = self.find_path_to_target(self.pos)
         
         if self.target_path:
             # Move para o próximo passo no caminho
-            next_step = self.target_path.pop(0)
+            next_step = self.target_path.popleft()
             self.model.grid.move_agent(self, next_step)
 
         # Verifica se está dentro do raio de visão de um Bombardeiro ou Logger
@@ -351,39 +418,42 @@ class Police(Person):
     def find_path_to_target(self, start_pos):
         """
         Busca em largura (BFS) para encontrar o menor caminho até um Bombardeiro ou Logger.
+        Cada posição guarda só a posição de onde foi alcançada, e o caminho é
+        remontado uma única vez ao encontrar o alvo.
 
         Args:
             start_pos: Posição inicial para iniciar a busca.
 
         Returns:
-            Uma lista de posições representando o caminho até o alvo mais próximo,
-            ou uma lista vazia se não houver alvos disponíveis.
+            Um deque de posições representando o caminho até o alvo mais próximo,
+            ou um deque vazio se não houver alvos disponíveis.
         """
-        queue = deque([(start_pos, [])])  # Fila de posições a serem exploradas e o caminho até elas
-        visited = set()  # Conjunto de posições visitadas
+        queue = deque([start_pos])  # Fila de posições a serem exploradas
+        parent = {start_pos: None}  # Posição de onde cada posição foi alcançada
 
         while queue:
-            current_pos, path = queue.popleft()
-
-            # Evita revisitar células
-            if current_pos in visited:
-                continue
-            visited.add(current_pos)
+            current_pos = queue.popleft()
 
             current_cell = self.model.grid.get_cell_list_contents(current_pos)
             # Verifica se há um Bombardeiro ou Logger
             target = next((obj for obj in current_cell if isinstance(obj, (Bomber, Logger)) and not obj.captured), None)
 
             if target:
-                return path + [current_pos]  # Retorna o caminho até o alvo (Bombardeiro ou Logger)
+                # Remonta o caminho até o alvo (Bombardeiro ou Logger) pelos pais
+                path = deque()
+                while current_pos is not None:
+                    path.appendleft(current_pos)
+                    current_pos = parent[current_pos]
+                return path
 
             # Explora os vizinhos ortogonais
             neighbors = self.model.grid.get_neighborhood(current_pos, moore=False, include_center=False)
             for neighbor in neighbors:
-                if neighbor not in visited:
-                    queue.append((neighbor, path + [current_pos]))
+                if neighbor not in parent:
+                    parent[neighbor] = current_pos
+                    queue.append(neighbor)
 
-        return []  # Retorna caminho vazio se não encontrar nenhum alvo
+        return deque()  # Retorna caminho vazio se não encontrar nenhum alvo
 
     @staticmethod
     def distance(pos1, pos2):
@@ -402,6 +472,8 @@ class Police(Person):
         return ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** 0.5
 
 class Bomber(Person):
+    __slots__ = ("bomb_radius", "speed", "cooldown", "steps_until_next_bombard", "captured")
+
     def __init__(self, pos, model, bomb_radius=3, speed=1, cooldown=5):
         super().__init__(pos, model)
         self.bomb_radius = bomb_radius  # Raio do bombardeio
@@ -421,7 +493,7 @@ class Bomber(Person):
         # Movimento aleatório
         neighbors = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
         if neighbors:
-            new_pos = random.choice(neighbors)
+            new_pos = self.random.choice(neighbors)
             if not self.model.grid.out_of_bounds(new_pos):
                 self.model.grid.move_agent(self, new_pos)
 
@@ -434,12 +506,14 @@ class Bomber(Person):
         """Bombardeia as árvores dentro do raio de ação."""
         trees_in_radius = [
             agent for agent in self.model.grid.get_neighbors(self.pos, moore=True, radius=self.bomb_radius)
-            if isinstance(agent, TreeCell) and agent.condition == "Fine"
+            if isinstance(agent, TreeCell) and agent.code == FINE
         ]
         for tree in trees_in_radius:
-            tree.condition = "Bombed"  # Marca as árvores como "Bombed" para indicar que foram bombardeadas
+            tree.set_code(BOMBED)  # Marca as árvores como "Bombed" para indicar que foram bombardeadas
 
 class Logger(Person):
+    __slots__ = ("cut_radius", "captured", "cooldown", "steps_until_next_cut")
+
     def __init__(self, pos, model, cut_radius=2, cooldown=3):
         super().__init__(pos, model)
         self.cut_radius = cut_radius  # Raio de corte de árvores
@@ -458,7 +532,7 @@ class Logger(Person):
         # Movimento aleatório
         neighbors = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
         if neighbors:
-            new_pos = random.choice(neighbors)
+            new_pos = self.random.choice(neighbors)
             if not self.model.grid.out_of_bounds(new_pos):
                 self.model.grid.move_agent(self, new_pos)
 
@@ -471,12 +545,13 @@ class Logger(Person):
         """Corta as árvores dentro do raio de ação do Logger."""
         trees_in_radius = [
             agent for agent in self.model.grid.get_neighbors(self.pos, moore=True, radius=self.cut_radius)
-            if isinstance(agent, TreeCell) and agent.condition == "Fine"
+            if isinstance(agent, TreeCell) and agent.code == FINE
         ]
         for tree in trees_in_radius:
-            tree.condition = "Cut"  # Marca a árvore como cortada.
+            tree.set_code(CUT)  # Marca a árvore como cortada.
 
-class Clima(mesa.Agent): #classe que representa o tempo na região do modelo.
+class Clima(CodedAgent): #classe que representa o tempo na região do modelo.
+    __slots__ = ("temperatura", "umidade", "pressao", "precipitacao")
 
     def __init__(self, pos, model, temperatura_media=26.0, umidade_media=80.0, pressao_media=1013.25, precipitacao_media=5.0):
         """
@@ -496,9 +571,9 @@ class Clima(mesa.Agent): #classe que representa o tempo na região do modelo.
 
     def step(self):
         if self.temperatura >= 30.0 and self.umidade >= 30.0 and self.precipitacao <= 10.0:
-            for agent in self.model.schedule.agents:
-                if isinstance(agent, TreeCell) and agent.condition == 'Fine':
-                    agent.condition = 'On Fire'
+            for agent in self.model.grid.landscape_cells(TREE):
+                if agent.code == FINE:
+                    agent.set_code(ON_FIRE)
 
     def verificar_fogo(model):
         total_de_arvores = 0
@@ -507,7 +582,7 @@ class Clima(mesa.Agent): #classe que representa o tempo na região do modelo.
         for agent in model.schedule.agents:
             total_de_arvores += 1
             if isinstance(agent, TreeCell):
-                if agent.condition == "On Fire":
+                if agent.code == ON_FIRE:
                     arvores_queimando += 1
 
         if total_de_arvores > 0:
@@ -523,7 +598,7 @@ class Clima(mesa.Agent): #classe que representa o tempo na região do modelo.
         for agent in model.schedule.agents:
             total_de_arvores += 1
             if isinstance(agent, TreeCell):
-                if agent.condition == "Burned Out":
+                if agent.code == BURNED_OUT:
                     arvores_queimadas += 1
 
         if total_de_arvores > 0:
@@ -542,53 +617,55 @@ class Clima(mesa.Agent): #classe que representa o tempo na região do modelo.
         porcentagem_fogo = self.verificar_fogo(model)
         porcentagem_queimadas = self.verificar_queimadas(model)
 
-        self.precipitacao = random.uniform(0.0, 15.0) if random.random() < 0.40 else 0.0
+        self.precipitacao = self.random.uniform(0.0, 15.0) if self.random.random() < 0.40 else 0.0
 
         if isinstance(self, TreeCell):
-            if self.condition == "Fine":
-                self.city_temp += random.uniform(-2.0, 2.0)
+            if self.code == FINE:
+                self.city_temp += self.random.uniform(-2.0, 2.0)
 
-                self.temperatura += random.uniform(-2.0, 2.0)
+                self.temperatura += self.random.uniform(-2.0, 2.0)
 
-                self.umidade += random.uniform(-5.0, 5.0)
+                self.umidade += self.random.uniform(-5.0, 5.0)
                 self.umidade = max(0, min(100, self.umidade))
 
-                self.pressao += random.uniform(-5.0, 5.0)
+                self.pressao += self.random.uniform(-5.0, 5.0)
                 self.pressao = max(900, min(1050, self.pressao))
 
-            if self.condition == "On Fire":
-                self.city_temp += (random.uniform(30.0, 60.0)*(porcentagem_fogo/100))
+            if self.code == ON_FIRE:
+                self.city_temp += (self.random.uniform(30.0, 60.0)*(porcentagem_fogo/100))
                 self.city_temp = min(max(self.city_temp, 30.0), 60.0)
 
-                self.temperatura += (random.uniform(800.0, 1200.0)*(porcentagem_fogo/100))
+                self.temperatura += (self.random.uniform(800.0, 1200.0)*(porcentagem_fogo/100))
 
-                self.umidade -= (random.uniform(self.umidade/2,self.umidade))*(porcentagem_fogo/100)
+                self.umidade -= (self.random.uniform(self.umidade/2,self.umidade))*(porcentagem_fogo/100)
 
                 if porcentagem_fogo >= 60:
-                    self.pressão -= (random.uniform(5, 20))*(porcentagem_fogo/100)
+                    self.pressão -= (self.random.uniform(5, 20))*(porcentagem_fogo/100)
                     self.pressao = max(900, min(1050, self.pressao))
 
-            if self.condition == "Burned Out":
+            if self.code == BURNED_OUT:
                 if porcentagem_queimadas >= 60:
-                    self.city_temp += random.uniform(-1, 5)
+                    self.city_temp += self.random.uniform(-1, 5)
                     self.city_temp = min(max(self.city_temp, 28.0), 36.0)
 
-                    self.temperatura += random.uniform(200, 600)*(porcentagem_queimadas/100)
+                    self.temperatura += self.random.uniform(200, 600)*(porcentagem_queimadas/100)
                     self.temperatura = min(max(self.temperatura, 30.0), 37.0)
 
-                    self.umidade += random.uniform(-5.0, 5.0)
+                    self.umidade += self.random.uniform(-5.0, 5.0)
                     self.umidade = max(0, min(80, self.umidade))
 
-                    self.pressao += random.uniform(-5.0, 5.0)
+                    self.pressao += self.random.uniform(-5.0, 5.0)
                     self.pressao = max(900, min(1050, self.pressao))
 
 class Chuva(Clima):
+    __slots__ = ("intensidade", "frequencia")
+
     def __init__(self, pos, model, intensidade = 0.5, frequencia=0.4, temperatura_cidade=28.0, temperatura_media=26.0, umidade_media=80.0, pressao_media=1013.25, precipitacao_media=5.0):
       super().__init__(pos, model)
       self.pos = pos
       self.intensidade = intensidade
       self.frequencia = frequencia        
-      self.condition = 'Chuva'
+      self.code = RAIN
 
     def step(self):
         x, y = self.pos
@@ -596,43 +673,28 @@ class Chuva(Clima):
 
         self.model.grid.move_agent(self, new_pos)
         if self.precipitacao > 0:
-            if random.random() < self.frequencia:
+            if self.random.random() < self.frequencia:
                 self.precipitacao = self.intensidade
-                self.umidade = min(100, self.umidade + random.uniform(5.0, 15.0))
-                self.temperatura = max(20.0, self.temperatura - random.uniform(1.0, 3.0))
-                self.pressao += random.uniform(0.0, 5.0)
+                self.umidade = min(100, self.umidade + self.random.uniform(5.0, 15.0))
+                self.temperatura = max(20.0, self.temperatura - self.random.uniform(1.0, 3.0))
+                self.pressao += self.random.uniform(0.0, 5.0)
             else:
                 self.precipitacao = 0.0
-                self.umidade = max(0, self.umidade - random.uniform(0.5, 1.5))
-                self.temperatura -= random.uniform(1.0, 3.0)
-                self.pressao -= random.uniform(0.0, 1.5)
-
-            for agent in self.model.schedule.agents:
-                if isinstance(agent, TreeCell):
-                    vizi_saudaveis = 0
-                    vizi_chamas = 0
-                    vizi_queimadas = 0
-
-                    if agent.condition == "On Fire" and self.precipitacao > 0:
-                        for neighbor in self.model.grid.get_neighbors(agent.pos, moore=True, include_center=False):
-                            if neighbor.condition == "Fine":
-                                vizi_saudaveis += 1
-                            elif neighbor.condition == "On Fire":
-                                vizi_chamas += 1
-                            else:
-                                vizi_queimadas += 1
-
-                        if vizi_chamas > 4:
-                            agent.condition = "Burned Out"
-                        if vizi_saudaveis > 4:
-                            agent.condition = "Fine"
-                        if vizi_queimadas > 4:
-                            agent.condition = "Fine"
+                self.umidade = max(0, self.umidade - self.random.uniform(0.5, 1.5))
+                self.temperatura -= self.random.uniform(1.0, 3.0)
+                self.pressao -= self.random.uniform(0.0, 1.5)
+
+            # A chuva age sobre todas as árvores em chamas de uma vez, no nível do modelo;
+            # o modelo aplica as regras uma única vez por passo, qualquer que seja o número de nuvens
+            if self.precipitacao > 0:
+                self.model.apply_rain()
         else:
             pass
 
 class Citizen(Person):
     """Represents a citizen living in cities, evacuating to the nearest safe city."""
+    __slots__ = ("target_city", "alive")
+
     def __init__(self, pos, model, resistencia_fogo=0, resistencia_fumaca=0.5):
         super().__init__(pos, model, resistencia_fogo, resistencia_fumaca)
         self.target_city = None  # Target city for evacuation
@@ -640,30 +702,13 @@ class Citizen(Person):
 
     def find_nearest_safe_city(self, start_pos):
         """
-        BFS to find the nearest non-evacuated city.
+        Looks up the nearest non-evacuated city in the model's shared nearest-safe-city map.
         Args:
             start_pos: Current position of the citizen.
         Returns:
             Position of the nearest non-evacuated city or None if none are available.
         """
-        queue = deque([start_pos])  # Start from the current position
-        visited = set()
-
-        while queue:
-            current_pos = queue.popleft()
-            if current_pos in visited:
-                continue
-            visited.add(current_pos)
-
-            cell_contents = self.model.grid.get_cell_list_contents([current_pos])
-            for agent in cell_contents:
-                if isinstance(agent, CityCell) and agent.condition != "Evacuated":
-                    return agent.pos
-
-            neighbors = self.model.grid.get_neighborhood(current_pos, moore=True, include_center=False)
-            queue.extend(neighbor for neighbor in neighbors if neighbor not in visited)
-
-        return None  # No safe city found
+        return self.model.nearest_safe_city(start_pos)
 
     def step(self):
         """Evacuate if in a city that is evacuating and avoid fire."""
@@ -674,7 +719,7 @@ class Citizen(Person):
 
         # Check if in an evacuating city
         current_cell = self.model.grid.get_cell_list_contents([self.pos])
-        in_evacuated_city = any(isinstance(agent, CityCell) and agent.condition == "Evacuated" for agent in current_cell)
+        in_evacuated_city = any(isinstance(agent, CityCell) and agent.code == EVACUATED for agent in current_cell)
 
         if in_evacuated_city and self.target_city is None:
             # Find the nearest safe city
@@ -697,7 +742,7 @@ class Citizen(Person):
 
         # Check for death by fire
         for agent in current_cell:
-            if isinstance(agent, TreeCell) and agent.condition in ["On Fire", "Burned Out"]:
+            if isinstance(agent, TreeCell) and agent.code in (ON_FIRE, BURNED_OUT):
                 self.alive = False
-                self.condition = "Dead"
+                self.code = DEAD
                 break
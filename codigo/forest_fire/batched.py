@@ -0,0 +1,105 @@
+import mesa
+import numpy as np
+import pandas as pd
+from conditions import ON_FIRE, BURNED_OUT, TREE, CONDITION_CODES
+from vectorized import (
+    FREQUENCIA_CHUVA, RAIO_EVACUACAO, _offsets_do_raio, aplicar_chuva, espalhar_fogo, evacuar_cidades,
+    rejeitar_agentes_moveis,
+)
+from landscape import gerar_paisagem
+
+
+class BatchedForestFire(mesa.Model):
+    """
+    Várias réplicas independentes do VectorizedForestFire num único array.
+
+    A paisagem das K réplicas fica em arrays (K, width, height) e cada passo aplica
+    chuva, propagação e evacuação a todas de uma vez, com as mesmas funções do
+    VectorizedForestFire. Cada réplica para pelas mesmas regras (sem fogo ou fogo
+    na última coluna) e, a partir daí, fica fora das operações dos passos seguintes.
+    Não há DataCollector por passo: `results()` dá o resultado final de cada réplica.
+    Como no VectorizedForestFire, pedir agentes móveis levanta ValueError.
+    """
+
+    def __init__(self, replicas=30, width=100, height=100, density=0.65, prob_de_sobrevivencia=0.0, vento="Norte", city_probability=0.01, grass_probability=0.05, num_pessoas=0, num_helicoptero=0, num_policiais=0, num_bombers=0, num_loggers=0, qtd_chuva = 20, seed=None, evacuation_radius=RAIO_EVACUACAO):
+        rejeitar_agentes_moveis(type(self).__name__, num_pessoas=num_pessoas, num_helicoptero=num_helicoptero, num_policiais=num_policiais, num_bombers=num_bombers, num_loggers=num_loggers)
+        super().__init__()
+
+        self.replicas = replicas
+        self.width = width
+        self.height = height
+        self.density = density
+        self.prob_de_sobrevivencia = prob_de_sobrevivencia
+        self.vento = vento
+        self.current_step = 0
+        self.rng = np.random.default_rng(self.random.getrandbits(64))
+
+        self.vegetation, self.condition, self.city = gerar_paisagem(
+            self.rng, (replicas, width, height), density, city_probability, grass_probability
+        )
+        self.evacuation_radius = evacuation_radius
+        self._raio_evacuacao = _offsets_do_raio(evacuation_radius)
+
+        # Estado de cada réplica
+        self.active_rain = np.full(replicas, qtd_chuva)
+        self.active = np.ones(replicas, dtype=bool)  # Réplicas ainda em execução
+        self.edge_reached = self._na_ultima_coluna(self.condition == ON_FIRE, self.vegetation)
+        self.steps = np.zeros(replicas, dtype=np.int64)  # Passo em que cada réplica parou
+        self.running = True
+
+    @staticmethod
+    def _na_ultima_coluna(novas, vegetation):
+        return (novas[:, -1, :] & (vegetation[:, -1, :] == TREE)).any(axis=1)
+
+    def step(self):
+        """
+        Avança um passo todas as réplicas que ainda estão em execução.
+        """
+        self.current_step += 1
+        ativas = np.flatnonzero(self.active)
+        todas = ativas.size == self.replicas
+        # Com réplicas paradas as operações são feitas só sobre as ativas e copiadas de volta
+        vegetation = self.vegetation if todas else self.vegetation[ativas]
+        condition = self.condition if todas else self.condition[ativas]
+        city = self.city if todas else self.city[ativas]
+
+        self.active_rain[ativas] = self.rng.binomial(self.active_rain[ativas], FREQUENCIA_CHUVA)
+        chovendo = np.flatnonzero(self.active_rain[ativas] > 0)
+        if chovendo.size:
+            com_chuva = condition[chovendo]
+            aplicar_chuva(vegetation[chovendo], com_chuva, city[chovendo])
+            condition[chovendo] = com_chuva
+        novas = espalhar_fogo(vegetation, condition, self.rng, self.prob_de_sobrevivencia, self.vento)
+        evacuar_cidades(city, condition, self.evacuation_radius, self._raio_evacuacao)
+
+        if not todas:
+            self.condition[ativas] = condition
+            self.city[ativas] = city
+
+        self.edge_reached[ativas] |= self._na_ultima_coluna(novas, vegetation)
+        sem_fogo = ~(condition == ON_FIRE).any(axis=(1, 2))
+        paradas = ativas[sem_fogo | self.edge_reached[ativas]]
+        self.active[paradas] = False
+        self.steps[paradas] = self.current_step
+        self.running = bool(self.active.any())
+
+    def count_types(self):
+        """Array (réplicas, códigos) com a contagem de cada condição em cada réplica."""
+        codigos = len(CONDITION_CODES) + 1
+        deslocamento = np.arange(self.replicas)[:, None, None] * codigos
+        contagens = np.bincount((self.condition + deslocamento).ravel(), minlength=self.replicas * codigos) \
+            + np.bincount((self.city + deslocamento).ravel(), minlength=self.replicas * codigos)
+        return contagens.reshape(self.replicas, codigos)
+
+    def results(self):
+        """
+        pd.DataFrame com uma linha por réplica: Density, Replica, BurnedFraction, ReachedEdge e Steps,
+        as colunas de experiments.run_replicas.
+        """
+        return pd.DataFrame({
+            "Density": self.density,
+            "Replica": np.arange(self.replicas),
+            "BurnedFraction": self.count_types()[:, BURNED_OUT] / (self.width * self.height),
+            "ReachedEdge": self.edge_reached.copy(),
+            "Steps": self.steps.copy(),
+        })
@@ -0,0 +1,117 @@
+"""
+Distribuição dos tamanhos de aglomerados pelo algoritmo de Hoshen–Kopelman.
+
+A grade é lida uma linha (coluna x) por vez: cada célula ocupada recebe o rótulo
+das vizinhas já vistas (vizinhança de Moore) e rótulos diferentes que se tocam
+são unidos numa estrutura union-find. Só a linha anterior e os tamanhos dos
+aglomerados ficam na memória, sem recursão, então a grade pode vir de um
+arquivo (numpy.memmap) maior que a memória ou de um gerador de linhas.
+"""
+import numpy as np
+
+from conditions import BURNED_OUT, TREE
+
+
+class ClusterStats:
+    """Aglomerados de uma máscara: tamanho de cada um e quais ligam a coluna 0 à última coluna."""
+
+    def __init__(self, sizes, spanning, num_cells):
+        self.sizes = sizes  # Tamanho de cada aglomerado
+        self.spanning = spanning  # Máscara dos aglomerados que atravessam a grade
+        self.num_cells = num_cells
+
+    @property
+    def percolates(self):
+        return bool(self.spanning.any())
+
+    @property
+    def largest_fraction(self):
+        """Tamanho do maior aglomerado dividido pelo número de células da grade."""
+        return self.sizes.max() / self.num_cells if self.sizes.size else 0.0
+
+    def histogram(self):
+        """Array com o número de aglomerados de cada tamanho (índice = tamanho)."""
+        return np.bincount(self.sizes)
+
+
+def label_clusters(rows, moore=True):
+    """
+    Encontra os aglomerados de células ocupadas, uma linha por vez.
+    Args:
+        rows: Máscara booleana (width, height) ou iterável com as linhas x = 0, 1, ...
+        moore: Vizinhança de Moore (como a propagação do fogo) ou de Von Neumann.
+    Returns:
+        ClusterStats com os aglomerados.
+    """
+    parent = []
+    size = []
+    edges = []  # 1 = toca a coluna 0
+    vizinhas_anteriores = (-1, 0, 1) if moore else (0,)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    anterior = None
+    num_cells = 0
+    x = -1
+    for x, row in enumerate(rows):
+        row = np.asarray(row, dtype=bool)
+        height = row.size
+        num_cells += height
+        if anterior is None:
+            anterior = [-1] * (height + 2)  # Uma célula vazia em cada ponta, para não testar os limites
+        atual = [-1] * (height + 2)
+        for y in np.flatnonzero(row).tolist():
+            rotulo = -1
+            for vizinha in [atual[y]] + [anterior[y + 1 + dy] for dy in vizinhas_anteriores]:
+                if vizinha < 0:
+                    continue
+                raiz = find(vizinha)
+                if rotulo < 0:
+                    rotulo = raiz
+                elif raiz != rotulo:
+                    if size[raiz] > size[rotulo]:
+                        rotulo, raiz = raiz, rotulo
+                    parent[raiz] = rotulo
+                    size[rotulo] += size[raiz]
+                    edges[rotulo] |= edges[raiz]
+            if rotulo < 0:
+                rotulo = len(parent)
+                parent.append(rotulo)
+                size.append(0)
+                edges.append(0)
+            size[rotulo] += 1
+            if x == 0:
+                edges[rotulo] |= 1
+            atual[y + 1] = rotulo
+        anterior = atual
+
+    raizes = [i for i in range(len(parent)) if parent[i] == i]
+    # A última linha lida é a borda oposta
+    direita = {find(i) for i in anterior or () if i >= 0}
+    return ClusterStats(
+        np.array([size[i] for i in raizes], dtype=np.int64),
+        np.array([edges[i] == 1 and i in direita for i in raizes], dtype=bool),
+        num_cells,
+    )
+
+
+def landscape_masks(model):
+    """
+    Máscaras (width, height) das árvores (a floresta inicial) e das células queimadas
+    ("Burned Out") de um ForestFire ou VectorizedForestFire, lidas dos arrays da paisagem.
+    """
+    return model.vegetation == TREE, model.condition == BURNED_OUT
+
+
+def model_clusters(model):
+    """
+    Aglomerados da floresta inicial e das manchas queimadas de um modelo.
+    Returns:
+        (ClusterStats das árvores, ClusterStats das células queimadas).
+    """
+    tree, burned = landscape_masks(model)
+    return label_clusters(tree), label_clusters(burned)
@@ -0,0 +1,183 @@
+import itertools
+from collections.abc import Sequence
+from operator import attrgetter
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnView(Sequence):
+    """
+    Visão somente leitura de uma coluna do coletor.
+    Os elementos saem como escalares Python (int/float), como nas listas do mesa.DataCollector.
+    """
+
+    def __init__(self, values):
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ColumnView(self.values[index])
+        return self.values[index].item()
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.values, dtype=dtype)
+
+
+class ColumnarDataCollector:
+    """
+    DataCollector colunar para as variáveis do modelo.
+
+    Compatível com o uso que o projeto faz do mesa.DataCollector: recebe o mesmo
+    dicionário de reporters, tem `collect(model)`, `model_vars[nome]` (usado pelos
+    gráficos do servidor) e `get_model_vars_dataframe()`. Cada coluna é um array
+    NumPy pré-alocado que dobra de tamanho quando enche, e o DataFrame é montado
+    sobre esses arrays, sem cópia.
+
+    Com um `sink` (ver sinks.py) as linhas são gravadas em blocos de `chunk_size`
+    durante a execução e, com `window`, só as últimas `window` linhas ficam na
+    memória; o DataFrame passa a ter apenas essas linhas, indexadas pelo passo.
+
+    As variáveis dos agentes e as tabelas seguem a API do mesa.DataCollector
+    (`agent_reporters`, `_agent_records`, `get_agent_vars_dataframe`, `tables`,
+    `add_table_row`, `get_table_dataframe`), guardadas em listas como no mesa, o
+    que permite usar o coletor com `mesa.batch_run`.
+    """
+
+    def __init__(self, model_reporters, capacity=256, sink=None, window=None, chunk_size=1024, agent_reporters=None, tables=None):
+        """
+        Args:
+            model_reporters: Dicionário nome -> função(model) com o valor de cada coluna.
+            capacity: Número inicial de linhas reservadas.
+            sink: Destino em disco das linhas (CSVSink, ParquetSink, ArrowSink) ou None.
+            window: Número de linhas mantidas na memória depois de gravadas (None = todas).
+            chunk_size: Número de linhas acumuladas antes de cada gravação no sink.
+            agent_reporters: Dicionário nome -> atributo, função(agent) ou [função, parâmetros], como no mesa.
+            tables: Dicionário nome da tabela -> lista de colunas, como no mesa.
+        """
+        if window is not None and sink is None:
+            raise ValueError("window só pode ser usado junto com um sink")
+        self.model_reporters = dict(model_reporters)
+        self.capacity = capacity
+        self.sink = sink
+        self.window = window
+        self.chunk_size = chunk_size
+        self.num_rows = 0  # Linhas na memória
+        self.first_row = 0  # Passo da primeira linha na memória
+        self._flushed = 0  # Linhas na memória que já foram gravadas no sink
+        self._columns = {}
+
+        self.agent_reporters = {}
+        self._agent_records = {}  # Passo do modelo -> lista de (passo, unique_id, valores...)
+        for name, reporter in (agent_reporters or {}).items():
+            self._new_agent_reporter(name, reporter)
+        self.tables = {name: {column: [] for column in columns} for name, columns in (tables or {}).items()}
+
+    def _new_agent_reporter(self, name, reporter):
+        if isinstance(reporter, str):
+            reporter = attrgetter(reporter)
+        elif isinstance(reporter, list):
+            func, params = reporter
+            reporter = lambda agent, func=func, params=params: func(agent, *params)
+        self.agent_reporters[name] = reporter
+
+    def collect(self, model):
+        """Calcula todas as colunas para o passo atual e grava uma linha."""
+        values = {name: reporter(model) for name, reporter in self.model_reporters.items()}
+        if not self._columns:
+            # O tipo de cada coluna vem do primeiro valor: contagens inteiras ou frações
+            self._columns = {
+                name: np.empty(self.capacity, dtype=np.int64 if isinstance(value, (int, np.integer)) else np.float64)
+                for name, value in values.items()
+            }
+        elif self.num_rows == self.capacity:
+            self.capacity *= 2
+            for name, column in self._columns.items():
+                grown = np.empty(self.capacity, dtype=column.dtype)
+                grown[:self.num_rows] = column[:self.num_rows]
+                self._columns[name] = grown
+
+        for name, value in values.items():
+            self._columns[name][self.num_rows] = value
+        self.num_rows += 1
+
+        if self.sink is not None and self.num_rows - self._flushed >= self.chunk_size:
+            self.flush()
+
+        if self.agent_reporters:
+            self._agent_records[model._steps] = self._record_agents(model)
+
+    def _record_agents(self, model):
+        """Valores dos agentes no passo atual: (passo, unique_id, valor de cada reporter)."""
+        reporters = list(self.agent_reporters.values())
+        agents = model.schedule.agents if getattr(model, "schedule", None) is not None else model.agents
+        return [(model._steps, agent.unique_id, *(reporter(agent) for reporter in reporters)) for agent in agents]
+
+    def add_table_row(self, table_name, row, ignore_missing=False):
+        """Acrescenta uma linha (dicionário coluna -> valor) a uma tabela, como no mesa.DataCollector."""
+        if table_name not in self.tables:
+            raise Exception("Table does not exist.")
+        table = self.tables[table_name]
+        if not ignore_missing and any(column not in row for column in table):
+            raise Exception("Could not insert row with missing column")
+        for column, values in table.items():
+            values.append(row.get(column))
+
+    def flush(self):
+        """Grava no sink as linhas ainda não gravadas e descarta as que saíram da janela."""
+        if self.sink is None or self._flushed == self.num_rows:
+            return
+        self.sink.write({name: column[self._flushed:self.num_rows] for name, column in self._columns.items()},
+                        self.first_row + self._flushed)
+        self._flushed = self.num_rows
+
+        if self.window is not None and self.num_rows > self.window:
+            # Arrays novos, para não alterar DataFrames já entregues que usam os antigos
+            drop = self.num_rows - self.window
+            for name, column in self._columns.items():
+                kept = np.empty(self.capacity, dtype=column.dtype)
+                kept[:self.window] = column[drop:self.num_rows]
+                self._columns[name] = kept
+            self.first_row += drop
+            self.num_rows = self._flushed = self.window
+
+    def close(self):
+        """Grava as linhas pendentes e fecha o sink."""
+        if self.sink is not None:
+            self.flush()
+            self.sink.close()
+            self.sink = None
+
+    def column(self, name):
+        """Array NumPy (visão, sem cópia) com os valores coletados da coluna."""
+        return self._columns[name][:self.num_rows]
+
+    @property
+    def model_vars(self):
+        return {name: ColumnView(self.column(name)) for name in self._columns}
+
+    def get_agent_vars_dataframe(self):
+        """DataFrame com uma linha por agente e coleta, indexado por Step e AgentID."""
+        if not self.agent_reporters:
+            raise UserWarning("No agent reporters have been defined in the DataCollector, returning empty DataFrame.")
+        return pd.DataFrame.from_records(
+            data=itertools.chain.from_iterable(self._agent_records.values()),
+            columns=["Step", "AgentID", *self.agent_reporters],
+            index=["Step", "AgentID"],
+        )
+
+    def get_table_dataframe(self, table_name):
+        """DataFrame com as linhas de uma tabela."""
+        if table_name not in self.tables:
+            raise Exception("No such table.")
+        return pd.DataFrame(self.tables[table_name])
+
+    def get_model_vars_dataframe(self):
+        """DataFrame com uma linha por coleta, montado sobre os arrays das colunas."""
+        data = pd.DataFrame({name: self.column(name) for name in self._columns}, copy=False)
+        if self.first_row:
+            data.index = pd.RangeIndex(self.first_row, self.first_row + self.num_rows)
+        return data
@@ -0,0 +1,33 @@
+"""
+Códigos inteiros para as condições das células e dos agentes.
+
+Os agentes guardam a condição como um destes códigos (atributo `code`) e os
+motores vetorizados os guardam em arrays NumPy; os nomes ("Fine", "On Fire", ...)
+só são usados nas bordas (`agent.condition`, DataCollector, visualização).
+"""
+
+# Condições das células (vegetação e cidades)
+EMPTY = 0
+FINE = 1
+ON_FIRE = 2
+BURNED_OUT = 3
+FIRE_OFF = 4
+BOMBED = 5
+CUT = 6
+CITY = 7
+EVACUATED = 8
+
+# Condições dos agentes móveis
+ALIVE = 9
+DEAD = 10
+AERIAL = 11
+RAIN = 12
+
+CONDITION_NAMES = (None, "Fine", "On Fire", "Burned Out", "Fire Off", "Bombed", "Cut", "City", "Evacuated",
+                   "Alive", "Dead", "Aerial", "Chuva")
+CONDITION_CODES = {name: code for code, name in enumerate(CONDITION_NAMES) if name is not None}
+
+# Tipos de vegetação de uma célula
+NO_VEGETATION = 0
+TREE = 1
+GRASS = 2
@@ -0,0 +1,147 @@
+"""
+Motor de ensemble com as réplicas codificadas nos bits de palavras uint64.
+
+Cada célula guarda, em cada plano (árvore, em chamas, queimada), uma palavra de
+64 bits: o bit k é o estado da célula na réplica k. A propagação de
+TreeCell.step é feita com operações bit a bit sobre a grade inteira: para cada
+uma das 8 direções de Moore, as vizinhas "Fine" de uma árvore em chamas pegam
+fogo onde o bit de uma máscara de Bernoulli vale 1. A máscara é montada pela
+expansão binária da probabilidade (ver `bernoulli_bits`), então cada sorteio
+serve a 64 réplicas de uma vez.
+"""
+import mesa
+import numpy as np
+import pandas as pd
+
+from vectorized import MOORE, ajusta_probabilidade_por_vento, deslocar
+
+BITS_PROBABILIDADE = 16  # Resolução das probabilidades: múltiplos de 2**-16
+TODOS = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def bernoulli_bits(rng, shape, p, bits=BITS_PROBABILIDADE):
+    """
+    Palavras uint64 em que cada bit vale 1 com probabilidade p (arredondada para múltiplos de 2**-bits).
+
+    Percorre os bits de q = p * 2**bits do menos para o mais significativo: com
+    uma palavra aleatória w, a máscara vira w | m quando o bit é 1 (P -> (1 + P) / 2)
+    e w & m quando é 0 (P -> P / 2), terminando com P = q / 2**bits.
+    """
+    q = int(round(p * 2 ** bits))
+    if q <= 0:
+        return np.zeros(shape, dtype=np.uint64)
+    if q >= 2 ** bits:
+        return np.full(shape, TODOS, dtype=np.uint64)
+    tamanho = int(np.prod(shape))
+    m = np.zeros(tamanho, dtype=np.uint64)
+    for i in range((q & -q).bit_length() - 1, bits):  # Os bits zero abaixo do primeiro 1 não mudam m = 0
+        w = rng.bit_generator.random_raw(tamanho)
+        m = (w | m) if (q >> i) & 1 else (w & m)
+    return m.reshape(shape)
+
+
+def contar_bits(planos, replicas):
+    """Número de bits 1 de cada réplica somado sobre a grade; planos tem forma (palavras, width, height)."""
+    contagem = np.zeros(planos.shape[0] * 64, dtype=np.int64)
+    palavras = planos.astype("<u8", copy=False).reshape(planos.shape[0], -1)
+    for inicio in range(0, palavras.shape[1], 1 << 16):
+        bloco = palavras[:, inicio:inicio + (1 << 16)]
+        bits = np.unpackbits(bloco.view(np.uint8).reshape(bloco.shape + (8,)), axis=-1, bitorder="little")
+        contagem += bits.sum(axis=1, dtype=np.int64).ravel()
+    return contagem[:replicas]
+
+
+def _bits_para_replicas(mascara, replicas):
+    """Índices das réplicas com o bit 1 em `mascara` (uma palavra por grupo de 64 réplicas)."""
+    bits = np.unpackbits(mascara.astype("<u8").view(np.uint8), bitorder="little")
+    return np.flatnonzero(bits[:replicas])
+
+
+class BitEnsembleForestFire(mesa.Model):
+    """
+    Ensemble de réplicas da regra de TreeCell (com vento) em paralelo nos bits de palavras uint64.
+
+    Cada grupo de 64 réplicas ocupa uma palavra por célula; com mais réplicas os
+    planos têm forma (palavras, width, height). Só árvores são simuladas: cidades,
+    grama, chuva e os agentes móveis são aceitos na assinatura mas ignorados.
+    Cada réplica para como no ForestFire (sem fogo ou fogo na última coluna) e
+    seu bit deixa de ser atualizado. `results()` tem as mesmas colunas do BatchedForestFire.
+    """
+
+    def __init__(self, replicas=64, width=100, height=100, density=0.65, prob_de_sobrevivencia=0.0, vento="Norte", city_probability=0.01, grass_probability=0.05, num_pessoas=10, num_helicoptero=5, num_policiais=5, num_bombers=3, num_loggers=3, qtd_chuva = 20, seed=None):
+        super().__init__()
+
+        self.replicas = replicas
+        self.width = width
+        self.height = height
+        self.density = density
+        self.prob_de_sobrevivencia = prob_de_sobrevivencia
+        self.vento = vento
+        self.current_step = 0
+        self.rng = np.random.default_rng(self.random.getrandbits(64))
+
+        palavras = -(-replicas // 64)
+        shape = (palavras, width, height)
+        self.tree = bernoulli_bits(self.rng, shape, density)
+        self.burning = np.zeros(shape, dtype=np.uint64)
+        self.burned = np.zeros(shape, dtype=np.uint64)
+        self.burning[:, 0, :] = self.tree[:, 0, :]  # Vamos começar o fogo na posição (0, y)
+
+        # Bits das réplicas em execução; os bits além de `replicas` começam desligados
+        bits = np.zeros(palavras * 64, dtype=np.uint8)
+        bits[:replicas] = 1
+        self.active = np.packbits(bits, bitorder="little").view("<u8").astype(np.uint64)
+        self.edge_reached = np.zeros(palavras, dtype=np.uint64)
+        if width == 1:
+            self.edge_reached = np.bitwise_or.reduce(self.burning[:, -1, :], axis=-1)
+        self.steps = np.zeros(replicas, dtype=np.int64)  # Passo em que cada réplica parou
+        self.running = True
+
+        # Probabilidade de ignição de cada direção: a árvore pega fogo se o sorteio passar de prob
+        self._prob_ignicao = {
+            (dx, dy): 1 - ajusta_probabilidade_por_vento(prob_de_sobrevivencia, vento, dx, dy) for dx, dy in MOORE
+        }
+
+    def step(self):
+        """
+        Avança um passo todas as réplicas em execução.
+        """
+        self.current_step += 1
+        ativo = self.active[:, None, None]
+        burning = self.burning & ativo
+        fine = self.tree & ~self.burning & ~self.burned & ativo
+        ignite = np.zeros_like(fine)
+
+        for dx, dy in MOORE:
+            alvos = fine & deslocar(burning, dx, dy)
+            celulas = np.nonzero(alvos)
+            if celulas[0].size == 0:
+                continue
+            sorteio = bernoulli_bits(self.rng, celulas[0].size, self._prob_ignicao[dx, dy])
+            ignite[celulas] |= alvos[celulas] & sorteio
+
+        self.burned |= burning
+        self.burning = (self.burning & ~ativo) | ignite
+
+        # Réplicas que param neste passo: fogo na última coluna ou nenhum fogo
+        self.edge_reached |= np.bitwise_or.reduce(ignite[:, -1, :], axis=-1)
+        com_fogo = np.bitwise_or.reduce(self.burning.reshape(self.burning.shape[0], -1), axis=1)
+        paradas = self.active & (self.edge_reached | ~com_fogo)
+        if paradas.any():
+            self.steps[_bits_para_replicas(paradas, self.replicas)] = self.current_step
+            self.active &= ~paradas
+        self.running = bool(self.active.any())
+
+    def results(self):
+        """
+        pd.DataFrame com uma linha por réplica: Density, Replica, BurnedFraction, ReachedEdge e Steps.
+        """
+        chegou = np.zeros(self.replicas, dtype=bool)
+        chegou[_bits_para_replicas(self.edge_reached, self.replicas)] = True
+        return pd.DataFrame({
+            "Density": self.density,
+            "Replica": np.arange(self.replicas),
+            "BurnedFraction": contar_bits(self.burned, self.replicas) / (self.width * self.height),
+            "ReachedEdge": chegou,
+            "Steps": self.steps.copy(),
+        })
@@ -0,0 +1,216 @@
+"""
+Execução em lote do experimento de transição de fase, em vários processos.
+
+Cada combinação (densidade, réplica) é um job independente com a sua própria
+semente, derivada de uma numpy.random.SeedSequence: o resultado é o mesmo
+qualquer que seja o número de processos ou a ordem em que os jobs terminam.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from model import ForestFire, classe_do_motor
+from batched import BatchedForestFire
+from ensemble import BitEnsembleForestFire
+
+# Parâmetros do modelo sem agentes, chuva, cidades, grama ou vento: percolação pura
+PERCOLACAO_PURA = dict(
+    prob_de_sobrevivencia=0.0, vento="Sem Direção", city_probability=0.0, grass_probability=0.0,
+    num_pessoas=0, num_helicoptero=0, num_policiais=0, num_bombers=0, num_loggers=0, qtd_chuva=0,
+)
+
+# Modelos que rodam várias réplicas de uma vez e têm `results()`
+ENSEMBLES = (BatchedForestFire, BitEnsembleForestFire)
+
+
+def run_replica(model_cls, grid_size, density, seed, model_kwargs):
+    """
+    Roda um modelo até parar.
+    Returns:
+        (fração queimada no último passo, se o fogo chegou à borda oposta, número de passos).
+    """
+    # O bloco `with` fecha o sink e o recorder do modelo, se houver, mesmo que a réplica falhe
+    with model_cls(grid_size, grid_size, density, seed=seed, **model_kwargs) as model:
+        # No VectorizedForestFire com PERCOLACAO_PURA o estado final é calculado sem executar os passos
+        model.run_model()
+    burned_fraction = model.datacollector.get_model_vars_dataframe()["BurnedFraction"].iloc[-1]
+    return float(burned_fraction), bool(model.edges_reached["right"]), model.current_step
+
+
+def run_job(model_cls, grid_size, density, seed, model_kwargs, replicas=1):
+    """
+    Roda um job: uma réplica ou, com um modelo de ENSEMBLES, `replicas` réplicas num único modelo.
+    Returns:
+        Lista com (fração queimada, chegou à borda oposta, número de passos) de cada réplica.
+    """
+    if not issubclass(model_cls, ENSEMBLES):
+        return [run_replica(model_cls, grid_size, density, seed, model_kwargs)]
+    model = model_cls(replicas, grid_size, grid_size, density, seed=seed, **model_kwargs)
+    model.run_model()
+    results = model.results()
+    return list(zip(results["BurnedFraction"].tolist(), results["ReachedEdge"].tolist(), results["Steps"].tolist()))
+
+
+def run_replicas(grid_size, densities, iterations=30, seed=None, model_cls=ForestFire, model_kwargs=None, max_workers=None, executor=None):
+    """
+    Roda `iterations` réplicas para cada densidade num conjunto de processos.
+    Args:
+        grid_size: Lado da grade (grid_size x grid_size).
+        densities: Densidades iniciais de árvores.
+        iterations: Número de réplicas por densidade.
+        seed: Semente (ou numpy.random.SeedSequence) de onde saem as sementes das réplicas (None = aleatória).
+        model_cls: ForestFire, VectorizedForestFire, BatchedForestFire ou BitEnsembleForestFire (estes
+            dois rodam um job com todas as réplicas de cada densidade, que ficam com a mesma Seed),
+            ou o nome de um motor de model.ENGINES ("agents", "vectorized").
+        model_kwargs: Demais parâmetros do modelo (por exemplo PERCOLACAO_PURA).
+        max_workers: Número de processos (None = todos os núcleos; 1 = no próprio processo).
+        executor: ProcessPoolExecutor já aberto, reaproveitado entre chamadas (ignora max_workers).
+    Returns:
+        pd.DataFrame com uma linha por réplica: Density, Replica, Seed, BurnedFraction, ReachedEdge, Steps.
+    """
+    model_kwargs = model_kwargs or {}
+    if isinstance(model_cls, str):
+        model_cls = classe_do_motor(model_cls)
+    densities = list(densities)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    # Jobs: (densidade, primeira réplica) -> semente
+    replicas_per_job = iterations if issubclass(model_cls, ENSEMBLES) else 1
+    seeds = iter(seed.spawn(len(densities) * iterations // replicas_per_job))
+    jobs = {
+        (i, r): int(next(seeds).generate_state(1, dtype=np.uint64)[0])
+        for i in range(len(densities))
+        for r in range(0, iterations, replicas_per_job)
+    }
+
+    results = {}
+    if executor is not None:
+        _run_jobs(executor, results, jobs, model_cls, grid_size, densities, model_kwargs, replicas_per_job)
+    elif max_workers == 1:
+        for (i, r), job_seed in jobs.items():
+            results[i, r] = run_job(model_cls, grid_size, densities[i], job_seed, model_kwargs, replicas_per_job)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            _run_jobs(executor, results, jobs, model_cls, grid_size, densities, model_kwargs, replicas_per_job)
+
+    return pd.DataFrame(
+        [
+            {"Density": densities[i], "Replica": r + k, "Seed": jobs[i, r],
+             "BurnedFraction": burned, "ReachedEdge": reached, "Steps": steps}
+            for (i, r), replicas in sorted(results.items())
+            for k, (burned, reached, steps) in enumerate(replicas)
+        ]
+    )
+
+
+def check_reproducible(grid_size, densities, iterations=4, seed=0, model_cls=ForestFire, model_kwargs=None, max_workers=2):
+    """
+    Confere se run_replicas dá a mesma tabela rodando no próprio processo e em `max_workers` processos.
+    Returns:
+        True se as duas tabelas são iguais.
+    """
+    serial = run_replicas(grid_size, densities, iterations, seed, model_cls, model_kwargs, max_workers=1)
+    paralelo = run_replicas(grid_size, densities, iterations, seed, model_cls, model_kwargs, max_workers=max_workers)
+    return serial.equals(paralelo)
+
+
+def _run_jobs(executor, results, jobs, model_cls, grid_size, densities, model_kwargs, replicas_per_job):
+    futures = {
+        executor.submit(run_job, model_cls, grid_size, densities[i], job_seed, model_kwargs, replicas_per_job): (i, r)
+        for (i, r), job_seed in jobs.items()
+    }
+    # Os resultados são recolhidos à medida que os jobs terminam
+    for future in as_completed(futures):
+        results[futures[future]] = future.result()
+
+
+def _aggregate(replicas):
+    """Agrega as réplicas por densidade nas colunas do experimento de transição de fase."""
+    grouped = replicas.groupby("Density", sort=False)
+    return pd.DataFrame({
+        "SpreadProbability": grouped["ReachedEdge"].mean(),
+        "AvgBurnedFraction": grouped["BurnedFraction"].mean(),
+        "StdBurnedFraction": grouped["BurnedFraction"].std(ddof=0),
+    }).reset_index()
+
+
+def run_phase_transition_experiment(grid_size, densities, iterations=30, seed=None, model_cls=ForestFire, model_kwargs=None, max_workers=None):
+    """
+    Versão paralela de `run_phase_transition_experiment` (Testes/Gabriely/Statistics.py).
+    Returns:
+        pd.DataFrame com as mesmas colunas: Density, SpreadProbability, AvgBurnedFraction, StdBurnedFraction.
+    """
+    replicas = run_replicas(grid_size, densities, iterations, seed, model_cls, model_kwargs, max_workers)
+    return _aggregate(replicas)
+
+
+def wilson_interval(successes, n, z=1.96):
+    """Intervalo de confiança de Wilson para uma proporção (successes em n tentativas)."""
+    p = successes / n
+    centro = (p + z * z / (2 * n)) / (1 + z * z / n)
+    margem = z / (1 + z * z / n) * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+    return centro - margem, centro + margem
+
+
+def find_threshold(grid_size, low=0.0, high=1.0, precision=0.01, batch=10, max_per_density=200, max_runs=5000, z=1.96,
+                   seed=None, model_cls=ForestFire, model_kwargs=None, max_workers=None):
+    """
+    Estima a densidade em que SpreadProbability passa de 0.5, por bissecção com réplicas sequenciais.
+
+    Em cada densidade testada as réplicas são rodadas em lotes de `batch` até o
+    intervalo de confiança de SpreadProbability ficar todo acima ou todo abaixo de
+    0.5; então o intervalo [low, high] é cortado ao meio. Longe do limiar poucos
+    lotes bastam, e as réplicas se concentram perto dele, onde a incerteza é maior.
+    Args:
+        grid_size: Lado da grade (grid_size x grid_size).
+        low, high: Densidades com SpreadProbability abaixo e acima de 0.5.
+        precision: Meia largura desejada para o intervalo final do limiar.
+        batch: Réplicas por lote.
+        max_per_density: Máximo de réplicas numa densidade; se o intervalo de confiança ainda
+            contém 0.5, o limiar não se distingue dela neste tamanho de grade e a busca para
+            com o intervalo [low, high] atual.
+        max_runs: Máximo de réplicas no total.
+        z: Quantil normal do intervalo de confiança de Wilson (1.96 = 95%).
+        seed, model_cls, model_kwargs, max_workers: Como em run_replicas.
+    Returns:
+        (limiar estimado, meia largura do intervalo final, pd.DataFrame com as densidades testadas nas
+        colunas de run_phase_transition_experiment mais "Iterations").
+    """
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    lotes = []
+    total = 0
+    executor = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) if max_workers != 1 else None
+    try:
+        while (high - low) / 2 > precision and total < max_runs:
+            density = (low + high) / 2
+            spread = runs = 0
+            while True:
+                replicas = run_replicas(grid_size, [density], batch, root.spawn(1)[0], model_cls, model_kwargs,
+                                        max_workers, executor)
+                lotes.append(replicas)
+                spread += int(replicas["ReachedEdge"].sum())
+                runs += len(replicas)
+                total += len(replicas)
+                inferior, superior = wilson_interval(spread, runs, z)
+                if inferior > 0.5 or superior < 0.5 or runs >= max_per_density or total >= max_runs:
+                    break
+
+            if inferior > 0.5:
+                high = density
+            elif superior < 0.5:
+                low = density
+            else:
+                # Não resolvido: o limiar está dentro da largura da transição nesta densidade;
+                # a busca para e o intervalo [low, high] atual fica como a incerteza
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    results = _aggregate(pd.concat(lotes, ignore_index=True)) if lotes else pd.DataFrame()
+    if lotes:
+        results["Iterations"] = pd.concat(lotes).groupby("Density", sort=False).size().to_numpy()
+        results = results.sort_values("Density", ignore_index=True)
+    return (low + high) / 2, (high - low) / 2, results
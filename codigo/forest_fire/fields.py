@@ -0,0 +1,283 @@
+import heapq
+import math
+from collections import deque
+
+import numpy as np
+
+INF = np.iinfo(np.int32).max  # Distância das células sem origem alcançável
+
+# Deslocamentos (dx, dy) das vizinhanças
+MOORE = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+VON_NEUMANN = [(-1, 0), (0, -1), (0, 1), (1, 0)]
+
+
+class DistanceField:
+    """
+    Campo de distâncias de uma busca em largura (BFS) com várias origens.
+
+    Guarda, para cada célula da grade, a distância em passos até a origem mais
+    próxima e qual é essa origem. Uma única busca atende todos os agentes que
+    procuram o mesmo tipo de alvo no passo.
+
+    O campo também pode ser mantido de forma incremental: `add_source` e
+    `remove_source` acumulam as mudanças e `update` refaz só a região afetada
+    (as células cuja distância diminui com as novas origens e as células que
+    tinham uma origem removida como a mais próxima).
+
+    `dist` e `source` são arrays int32 criados só na primeira busca, então um
+    campo que nunca é consultado não ocupa memória.
+    """
+
+    def __init__(self, width, height, moore=True):
+        """
+        Args:
+            width, height: Dimensões da grade.
+            moore: Usa a vizinhança de Moore (8 vizinhos) ou a de Von Neumann (4 vizinhos).
+        """
+        self.width = width
+        self.height = height
+        self.offsets = MOORE if moore else VON_NEUMANN
+        self.dist = None  # Distância de cada célula até a origem mais próxima
+        self.source = None  # Índice da origem mais próxima de cada célula
+        self.num_sources = 0
+        self._novas = set()  # Origens adicionadas desde o último update
+        self._removidas = set()  # Origens removidas desde o último update
+
+    def index(self, pos):
+        x, y = pos
+        return x * self.height + y
+
+    def pos(self, index):
+        return divmod(index, self.height)
+
+    def neighbors(self, index):
+        """Índices das células vizinhas dentro da grade."""
+        x, y = divmod(index, self.height)
+        for dx, dy in self.offsets:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.width and 0 <= ny < self.height:
+                yield nx * self.height + ny
+
+    def _alocar(self):
+        self.dist = np.full(self.width * self.height, INF, dtype=np.int32)
+        self.source = np.full(self.width * self.height, -1, dtype=np.int32)
+
+    def rebuild(self, sources):
+        """
+        Recalcula o campo inteiro com uma BFS a partir das origens.
+        Args:
+            sources: Posições (x, y) das origens.
+        """
+        if self.dist is None:
+            self._alocar()
+        else:
+            self.dist.fill(INF)
+            self.source.fill(-1)
+        # Os laços abaixo leem e escrevem ints do Python pelas memoryviews, sem criar escalares do NumPy
+        dist, source = memoryview(self.dist), memoryview(self.source)
+        self._novas.clear()
+        self._removidas.clear()
+        queue = deque()
+        for pos in sources:
+            i = self.index(pos)
+            if dist[i] != 0:
+                dist[i] = 0
+                source[i] = i
+                queue.append(i)
+        self.num_sources = len(queue)
+
+        while queue:
+            i = queue.popleft()
+            d = dist[i] + 1
+            for j in self.neighbors(i):
+                if dist[j] == INF:
+                    dist[j] = d
+                    source[j] = source[i]
+                    queue.append(j)
+
+    def add_source(self, pos):
+        """Marca a posição como origem; o campo é reparado no próximo `update`."""
+        i = self.index(pos)
+        self._removidas.discard(i)
+        self._novas.add(i)
+
+    def remove_source(self, pos):
+        """Deixa de usar a posição como origem; o campo é reparado no próximo `update`."""
+        i = self.index(pos)
+        self._novas.discard(i)
+        self._removidas.add(i)
+
+    def update(self):
+        """
+        Aplica as origens adicionadas e removidas desde o último update.
+        O custo depende do número de células cuja distância ou origem mudou.
+        """
+        if not self._novas and not self._removidas:
+            return
+        if self.dist is None:
+            self._alocar()  # Primeira consulta: sem origens no campo, cai na BFS completa abaixo
+        dist, source = memoryview(self.dist), memoryview(self.source)
+        novas = {i for i in self._novas if source[i] != i}
+        removidas = {i for i in self._removidas if source[i] == i}
+        self._novas.clear()
+        self._removidas.clear()
+
+        if len(novas) + 2 * len(removidas) > self.num_sources:
+            # Com a maior parte das origens trocada a região afetada é quase a grade
+            # toda, e uma BFS completa sai mais barata que o reparo
+            origens = np.flatnonzero(self.source == np.arange(self.source.size, dtype=np.int32)).tolist()
+            mantidas = [i for i in origens if i not in removidas]
+            self.rebuild([self.pos(i) for i in mantidas + list(novas)])
+            return
+        self.num_sources += len(novas) - len(removidas)
+
+        # Apaga as regiões das origens removidas (as células que tinham essa origem como a mais próxima)
+        afetadas = []
+        for s in removidas:
+            stack = [s]
+            while stack:
+                i = stack.pop()
+                if source[i] == s:
+                    source[i] = -1
+                    dist[i] = INF
+                    afetadas.append(i)
+                    stack.extend(self.neighbors(i))
+
+        # Sementes: a borda das regiões apagadas e as novas origens
+        heap = []
+        for i in afetadas:
+            for j in self.neighbors(i):
+                if source[j] >= 0:
+                    heap.append((dist[j], j))
+        for i in novas:
+            dist[i] = 0
+            source[i] = i
+            heap.append((0, i))
+        heapq.heapify(heap)
+
+        # Propaga só enquanto a distância melhora
+        while heap:
+            d, i = heapq.heappop(heap)
+            if d > dist[i]:
+                continue
+            d += 1
+            for j in self.neighbors(i):
+                if d < dist[j]:
+                    dist[j] = d
+                    source[j] = source[i]
+                    heapq.heappush(heap, (d, j))
+
+    def distance(self, pos):
+        """Distância da posição até a origem mais próxima (INF se não houver origens)."""
+        if self.dist is None:
+            return INF
+        return int(self.dist[self.index(pos)])
+
+    def nearest(self, pos):
+        """Posição da origem mais próxima ou `None` se não houver origens."""
+        if self.source is None:
+            return None
+        i = int(self.source[self.index(pos)])
+        return self.pos(i) if i >= 0 else None
+
+
+class SpatialIndex:
+    """
+    Índice espacial dinâmico de posições, dividido em baldes quadrados.
+
+    Inserir e remover uma posição custa O(1). A busca do vizinho mais próximo
+    olha os baldes em anéis a partir da posição consultada e para assim que
+    nenhum balde mais distante pode ter uma posição mais próxima, então o
+    custo não depende do tamanho da grade.
+    """
+
+    def __init__(self, width, height, bucket_size=8):
+        """
+        Args:
+            width, height: Dimensões da grade.
+            bucket_size: Lado dos baldes, em células.
+        """
+        self.width = width
+        self.height = height
+        self.bucket_size = bucket_size
+        self.buckets = {}  # (bx, by) -> conjunto de posições; só baldes não vazios
+        self.size = 0
+
+    def _bucket(self, pos):
+        return pos[0] // self.bucket_size, pos[1] // self.bucket_size
+
+    def add(self, pos):
+        bucket = self.buckets.setdefault(self._bucket(pos), set())
+        if pos not in bucket:
+            bucket.add(pos)
+            self.size += 1
+
+    def discard(self, pos):
+        key = self._bucket(pos)
+        bucket = self.buckets.get(key)
+        if bucket is not None and pos in bucket:
+            bucket.remove(pos)
+            self.size -= 1
+            if not bucket:
+                del self.buckets[key]
+
+    def _ring(self, bx, by, k):
+        """Baldes não vazios a exatamente k baldes (Chebyshev) de (bx, by)."""
+        if k == 0:
+            bucket = self.buckets.get((bx, by))
+            if bucket:
+                yield bucket
+            return
+        for i in range(bx - k, bx + k + 1):
+            for j in (by - k, by + k):
+                bucket = self.buckets.get((i, j))
+                if bucket:
+                    yield bucket
+        for j in range(by - k + 1, by + k):
+            for i in (bx - k, bx + k):
+                bucket = self.buckets.get((i, j))
+                if bucket:
+                    yield bucket
+
+    def nearest(self, pos):
+        """
+        Posição mais próxima na distância de Chebyshev (a distância da BFS com
+        vizinhança de Moore numa grade sem obstáculos) ou None se o índice estiver vazio.
+        """
+        if self.size == 0:
+            return None
+        x, y = pos
+        bx, by = self._bucket(pos)
+        max_k = max(bx, by,
+                    (self.width - 1) // self.bucket_size - bx,
+                    (self.height - 1) // self.bucket_size - by)
+        best, best_dist = None, None
+        for k in range(max_k + 1):
+            # Qualquer posição num balde do anel k está a pelo menos (k - 1) * bucket_size + 1
+            if best is not None and best_dist <= (k - 1) * self.bucket_size:
+                break
+            for bucket in self._ring(bx, by, k):
+                for other in bucket:
+                    d = max(abs(other[0] - x), abs(other[1] - y))
+                    if best is None or d < best_dist:
+                        best, best_dist = other, d
+        return best
+
+    def any_within(self, pos, radius, include_center=False):
+        """
+        Verifica se há alguma posição a uma distância euclidiana <= radius (que pode ser fracionário).
+        Com bucket_size igual ao raio arredondado para cima a busca olha no máximo 3x3 baldes.
+        """
+        x, y = pos
+        r2 = radius * radius
+        alcance = math.ceil(radius)  # Os baldes são inteiros; o teste abaixo usa o raio exato
+        bx0, by0 = self._bucket((max(0, x - alcance), max(0, y - alcance)))
+        bx1, by1 = self._bucket((x + alcance, y + alcance))
+        for bx in range(bx0, bx1 + 1):
+            for by in range(by0, by1 + 1):
+                for other in self.buckets.get((bx, by), ()):
+                    if other == pos and not include_center:
+                        continue
+                    if (other[0] - x) ** 2 + (other[1] - y) ** 2 <= r2:
+                        return True
+        return False
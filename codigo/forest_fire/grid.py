@@ -0,0 +1,192 @@
+"""
+Grade com a paisagem fixa (árvores e grama) guardada nos arrays do modelo.
+
+O MultiGrid do mesa guarda uma lista de agentes em cada célula e cada árvore ou
+grama é um agente completo. Aqui o tipo de vegetação, a condição e a
+probabilidade de sobrevivência das células ficam nos arrays do ForestFire
+(`vegetation`, `condition` e `survival`) e só as células com outros agentes
+(cidades e agentes móveis) têm lista. TreeCell e GrassCell viram visões de uma
+célula dos arrays, criadas quando alguém pede os agentes de uma célula
+(get_cell_list_contents, get_neighbors, a visualização...) e reaproveitadas
+enquanto estiverem em uso, então há no máximo um objeto por célula.
+"""
+import weakref
+
+import mesa
+import numpy as np
+from mesa.space import accept_tuple_argument, is_integer, warn_if_agent_has_position_already
+
+from agent import ArrayCell, TreeCell, GrassCell
+from conditions import EMPTY, TREE
+
+# Deslocamentos da vizinhança de raio 1, na ordem do mesa: (moore, include_center) -> deslocamentos
+_VIZINHANCAS = {
+    (moore, centro): tuple(
+        (dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+        if (moore or abs(dx) + abs(dy) <= 1) and (centro or dx or dy)
+    )
+    for moore in (True, False)
+    for centro in (True, False)
+}
+
+
+class LandscapeGrid(mesa.space.MultiGrid):
+    """
+    MultiGrid em que as árvores e a grama vêm dos arrays do modelo.
+
+    Os métodos de consulta do MultiGrid (get_cell_list_contents, iter_neighbors,
+    get_neighbors, coord_iter...) devolvem, em cada célula, a visão da vegetação
+    seguida dos outros agentes na ordem em que foram colocados.
+    """
+
+    def __init__(self, model, width, height, torus=False, property_layers=None):
+        """
+        Args:
+            model: Modelo dono dos arrays `vegetation`, `condition` e `survival` (width, height).
+            width, height: Dimensões da grade.
+            torus: Se a grade dá a volta nas bordas.
+            property_layers: PropertyLayer ou lista delas, como no MultiGrid.
+        """
+        # O __init__ do MultiGrid criaria uma lista para cada célula (milhões de listas nas grades
+        # grandes), então os atributos que ele define são repetidos aqui; eles seguem o mesa 2.4,
+        # a versão fixada em requirements.txt
+        self.width = width
+        self.height = height
+        self.torus = torus
+        self.num_cells = width * height
+        self._empties_built = False
+        self._neighborhood_cache = {}
+        self.cutoff_empties = 7.953 * self.num_cells ** 0.384
+        self.properties = {}
+        if property_layers:
+            for layer in property_layers if isinstance(property_layers, list) else [property_layers]:
+                self.add_property_layer(layer)
+
+        self.model = model
+        self._contents = {}  # (x, y) -> agentes que não são da paisagem, só nas células ocupadas
+        self.proxies = weakref.WeakValueDictionary()  # (x, y) -> visão da célula em uso
+
+    @property
+    def _empty_mask(self):
+        """Máscara (width, height) das células sem vegetação e sem agentes, usada pelo empty_mask do mesa."""
+        mask = self.model.vegetation == EMPTY
+        for x, y in self._contents:
+            mask[x, y] = False
+        return mask
+
+    def landscape_cell(self, pos):
+        """TreeCell ou GrassCell da posição, ou None se não houver vegetação."""
+        cell = self.proxies.get(pos)
+        if cell is None:
+            tipo = self.model.vegetation.item(pos)
+            if tipo == EMPTY:
+                return None
+            cell = (TreeCell if tipo == TREE else GrassCell).view(self.model, pos)
+            self.proxies[pos] = cell
+        return cell
+
+    def landscape_cells(self, vegetation=None):
+        """
+        Gerador com as visões de todas as células com vegetação (ou só das de um tipo), em ordem de x e y.
+        """
+        mascara = self.model.vegetation != EMPTY if vegetation is None else self.model.vegetation == vegetation
+        for i in np.flatnonzero(mascara).tolist():
+            yield self.landscape_cell(divmod(i, self.height))
+
+    @warn_if_agent_has_position_already
+    def place_agent(self, agent, pos):
+        """Coloca o agente na posição; TreeCell e GrassCell já estão nos arrays, na posição em que foram criadas."""
+        if isinstance(agent, ArrayCell):
+            return
+        x, y = pos
+        contents = self._contents.setdefault((x, y), [])
+        if agent.pos is None or agent not in contents:
+            contents.append(agent)
+            agent.pos = pos
+
+    def place_agents(self, agents):
+        """
+        Coloca de uma vez agentes recém-criados, cada um na posição já guardada em `agent.pos`
+        (sem o aviso de place_agent para agentes que já têm posição).
+        """
+        contents = self._contents
+        for agent in agents:
+            contents.setdefault(agent.pos, []).append(agent)
+
+    def remove_agent(self, agent):
+        if isinstance(agent, ArrayCell):
+            raise ValueError("As células da paisagem ficam nos arrays do modelo e não saem da grade")
+        pos = agent.pos
+        contents = self._contents[pos]
+        contents.remove(agent)
+        if not contents:
+            del self._contents[pos]
+        agent.pos = None
+
+    def get_neighborhood(self, pos, moore, include_center=False, radius=1):
+        if radius != 1 or self.torus:
+            return super().get_neighborhood(pos, moore, include_center, radius)
+        # Raio 1 sem o cache do mesa, que guardaria uma tupla para cada célula alcançada pelo fogo
+        if self.out_of_bounds(pos):
+            raise Exception("The `pos` tuple passed is out of bounds.")
+        x, y = pos
+        width, height = self.width, self.height
+        return tuple(
+            (x + dx, y + dy) for dx, dy in _VIZINHANCAS[bool(moore), bool(include_center)]
+            if 0 <= x + dx < width and 0 <= y + dy < height
+        )
+
+    def iter_neighbors(self, pos, moore, include_center=False, radius=1):
+        return self.iter_cell_list_contents(self.get_neighborhood(pos, moore, include_center, radius))
+
+    @accept_tuple_argument
+    def iter_cell_list_contents(self, cell_list):
+        vegetation = self.model.vegetation
+        for x, y in cell_list:
+            if vegetation.item(x, y) != EMPTY:
+                yield self.landscape_cell((x, y))
+            contents = self._contents.get((x, y))
+            if contents:
+                yield from contents
+
+    def is_cell_empty(self, pos):
+        x, y = pos
+        return self.model.vegetation.item(x, y) == EMPTY and (x, y) not in self._contents
+
+    @property
+    def empties(self):
+        """Células sem vegetação e sem agentes (calculado a cada chamada)."""
+        livres = np.argwhere(self.model.vegetation == EMPTY).tolist()
+        return {(x, y) for x, y in livres if (x, y) not in self._contents}
+
+    def _cell(self, x, y):
+        return self.get_cell_list_contents([(x, y)])
+
+    def __getitem__(self, index):
+        """Mesmos índices do MultiGrid: grid[x], grid[x, y], grid[[(x1, y1), ...]] e fatias em x e y."""
+        if isinstance(index, int):
+            x = range(self.width)[index]
+            return [self._cell(x, y) for y in range(self.height)]
+        if isinstance(index[0], tuple):
+            return [self._cell(*self.torus_adj(pos)) for pos in index]
+
+        x, y = index
+        x_int, y_int = is_integer(x), is_integer(y)
+        if x_int and y_int:
+            return self._cell(*self.torus_adj(index))
+        if x_int:
+            x, _ = self.torus_adj((x, 0))
+            return [self._cell(x, j) for j in range(self.height)[y]]
+        if y_int:
+            _, y = self.torus_adj((0, y))
+            return [self._cell(i, y) for i in range(self.width)[x]]
+        return [self._cell(i, j) for i in range(self.width)[x] for j in range(self.height)[y]]
+
+    def coord_iter(self):
+        for x in range(self.width):
+            for y in range(self.height):
+                yield self.get_cell_list_contents([(x, y)]), (x, y)
+
+    def __iter__(self):
+        for contents, _ in self.coord_iter():
+            yield contents
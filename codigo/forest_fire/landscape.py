@@ -0,0 +1,146 @@
+"""
+Sorteio da paisagem inicial, compartilhado pelo ForestFire e pelos motores vetorizados.
+
+As regras são as do laço original do ForestFire (árvore com probabilidade
+`density`; senão cidade; senão grama; depois uma segunda passada de cidades
+sobre todas as células), mas cada regra é um único sorteio da grade inteira com
+um numpy.random.Generator, em vez de até três chamadas a random.random() por
+célula. As proporções de árvores, cidades e grama têm a mesma distribuição.
+
+LandscapeCache guarda as paisagens já sorteadas por parâmetros e semente, para
+que réplicas repetidas e o "Reset" do servidor com a mesma semente não sorteiem
+a mesma grade de novo.
+"""
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from conditions import EMPTY, FINE, ON_FIRE, CITY, NO_VEGETATION, TREE, GRASS
+
+
+def sortear_paisagem(rng, shape, density, city_probability, grass_probability):
+    """
+    Sorteia as máscaras da paisagem inicial.
+    Args:
+        rng: numpy.random.Generator usado nos sorteios.
+        shape: (width, height) ou (réplicas, width, height).
+    Returns:
+        (tree, city, grass, extra_city), máscaras booleanas; `city` são as cidades da primeira
+        passada (só onde não há árvore) e `extra_city` as da segunda, que pode cair em qualquer célula.
+    """
+    tree = rng.random(shape) < density
+    city = ~tree & (rng.random(shape) < city_probability)
+    grass = ~tree & ~city & (rng.random(shape) < grass_probability)
+    extra_city = rng.random(shape) < city_probability
+    return tree, city, grass, extra_city
+
+
+def vegetation_array(tree, grass):
+    """Array int8 com o tipo de vegetação (NO_VEGETATION, TREE, GRASS) a partir das máscaras."""
+    vegetation = np.full(tree.shape, NO_VEGETATION, dtype=np.int8)
+    vegetation[tree] = TREE
+    vegetation[grass] = GRASS
+    return vegetation
+
+
+def gerar_paisagem(rng, shape, density, city_probability, grass_probability):
+    """
+    Sorteia a paisagem inicial com as mesmas regras do ForestFire e acende as árvores da coluna 0.
+    Args:
+        shape: (width, height) ou (réplicas, width, height).
+    Returns:
+        (vegetation, condition, city), arrays int8 com os códigos de `conditions`.
+    """
+    tree, city, grass, extra_city = sortear_paisagem(rng, shape, density, city_probability, grass_probability)
+    vegetation = vegetation_array(tree, grass)
+    condition = np.where(vegetation != NO_VEGETATION, FINE, EMPTY).astype(np.int8)
+    condition[..., 0, :][tree[..., 0, :]] = ON_FIRE  # Vamos começar o fogo na posição (0, y)
+    return vegetation, condition, np.where(city | extra_city, CITY, EMPTY).astype(np.int8)
+
+
+class LandscapeCache:
+    """
+    Paisagens de sortear_paisagem por semente e parâmetros de geração.
+
+    As quatro máscaras ficam compactadas com np.packbits (um bit por célula e
+    máscara) num dicionário LRU com até `maxsize` paisagens. Com `directory`,
+    cada paisagem também é gravada num arquivo .npz, que outros processos e
+    execuções reaproveitam.
+    """
+
+    def __init__(self, maxsize=16, directory=None):
+        """
+        Args:
+            maxsize: Número de paisagens mantidas em memória (as usadas há mais tempo saem primeiro).
+            directory: Diretório dos arquivos .npz (None = só em memória).
+        """
+        self.maxsize = maxsize
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._paisagens = OrderedDict()  # chave -> máscaras compactadas
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(seed, shape, density, city_probability, grass_probability):
+        return int(seed), tuple(int(n) for n in shape), float(density), float(city_probability), float(grass_probability)
+
+    def masks(self, seed, shape, density, city_probability, grass_probability):
+        """
+        Máscaras de sortear_paisagem com np.random.default_rng(seed), sorteadas só se a paisagem
+        não estiver em memória nem em disco. Cada chamada devolve arrays novos.
+        """
+        key = self.key(seed, shape, density, city_probability, grass_probability)
+        packed = self._paisagens.get(key)
+        if packed is not None:
+            self._paisagens.move_to_end(key)
+            self.hits += 1
+        else:
+            packed = self._load(key)
+            if packed is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                masks = sortear_paisagem(np.random.default_rng(key[0]), key[1], density, city_probability, grass_probability)
+                packed = np.packbits(np.stack(masks))
+                self._save(key, packed)
+            self._paisagens[key] = packed
+            while len(self._paisagens) > self.maxsize:
+                self._paisagens.popitem(last=False)
+
+        n = int(np.prod(key[1]))
+        return tuple(np.unpackbits(packed, count=4 * n).view(bool).reshape((4,) + key[1]))
+
+    def clear(self):
+        """Esvazia o cache em memória (os arquivos em disco ficam)."""
+        self._paisagens.clear()
+
+    def __len__(self):
+        return len(self._paisagens)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(repr(key).encode()).hexdigest() + ".npz")
+
+    def _load(self, key):
+        if self.directory is None or not os.path.exists(self._path(key)):
+            return None
+        with np.load(self._path(key)) as data:
+            # A chave completa é conferida para não depender só do nome do arquivo
+            return data["masks"] if str(data["key"]) == repr(key) else None
+
+    def _save(self, key, packed):
+        if self.directory is None:
+            return
+        # Grava num arquivo temporário e renomeia, para outro processo nunca ler um arquivo pela metade
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, masks=packed, key=repr(key))
+        os.replace(tmp, path)
+
+
+# Cache em memória compartilhado, para passar como landscape_cache (o servidor usa este)
+CACHE_PAISAGENS = LandscapeCache()
@@ -1,19 +1,78 @@
 import mesa
 import math
-from agent import TreeCell, CityCell, GrassCell, Person, GroundFirefighter, AerialFirefighter, Police, Bomber, Logger, Citizen, Chuva, Clima # Certifique-se de que GrassCell seja importado
+from collections import Counter
+from agent import LandscapeCell, TreeCell, CityCell, GrassCell, Person, GroundFirefighter, AerialFirefighter, Police, Bomber, Logger, Citizen, Chuva, Clima # Certifique-se de que GrassCell seja importado
+from scheduler import FrontierActivation, LandscapeActivation
+from grid import LandscapeGrid
+from collector import ColumnarDataCollector
+from sinks import open_sink
+from fields import DistanceField, SpatialIndex, INF
+from recorder import HistoryRecorder
+from landscape import LandscapeCache, sortear_paisagem, vegetation_array
+from conditions import CONDITION_CODES, CONDITION_NAMES, EMPTY, FINE, ON_FIRE, BURNED_OUT, EVACUATED
+from vectorized import VectorizedForestFire
+import numpy as np
+from collections import deque
 
 
 class ForestFire(mesa.Model):
-    def __init__(self, width=100, height=100, density=0.65, prob_de_sobrevivencia=0.0, vento="Norte", city_probability=0.01, grass_probability=0.05, num_pessoas=10, num_helicoptero=5, num_policiais=5, num_bombers=3, num_loggers=3, qtd_chuva = 20):
+    def __init__(self, width=100, height=100, density=0.65, prob_de_sobrevivencia=0.0, vento="Norte", city_probability=0.01, grass_probability=0.05, num_pessoas=10, num_helicoptero=5, num_policiais=5, num_bombers=3, num_loggers=3, qtd_chuva = 20, frontier=True, debug=False, police_field=True, evacuation_radius=10, sink=None, window=None, chunk_size=1024, recorder=None, landscape_cache=None, seed=None):
+        # seed é usado pelo mesa.Model.__new__ para criar self.random
         super().__init__()
 
-        self.schedule = mesa.time.RandomActivation(self)
-        self.grid = mesa.space.MultiGrid(width, height, torus=False)
+        self.current_step = 0
+        self.recorder = None  # Ligado no fim do __init__, depois de criada a paisagem
+
+        # Contadores por código de condição das células, atualizados a cada mudança de condição
+        self.condition_counts = [0] * len(CONDITION_NAMES)
+        self.debug = debug
+
+        # Com frontier=True só as árvores e gramas em chamas são ativadas a cada passo
+        if frontier:
+            self.schedule = FrontierActivation(self, passive=(TreeCell, GrassCell))
+        else:
+            self.schedule = LandscapeActivation(self)
+
+        # Paisagem fixa (árvores e grama) guardada em arrays; TreeCell e GrassCell são visões
+        # destas células, criadas pela grade só quando necessário (ver grid.py)
+        self.vegetation = np.zeros((width, height), dtype=np.int8)  # EMPTY, TREE ou GRASS
+        self.condition = np.zeros((width, height), dtype=np.int8)  # Código da condição de cada célula
+        self.survival = np.zeros((width, height))  # prob_de_sobrevivencia de cada árvore
+        self.grid = LandscapeGrid(self, width, height, torus=False)
         self.prob_de_sobrevivencia = prob_de_sobrevivencia
         self.vento = vento
         self.edge_reached = False
+        # Alcance do fogo nas árvores, atualizado a cada ignição
+        self.max_x_reached = -1
+        self.edges_reached = {"left": False, "right": False, "bottom": False, "top": False}
+
+        # Passo em que cada célula pegou fogo pela primeira vez e em que o fogo dela se apagou
+        # pela última vez (-1 = nunca); expostos por ignition_step e extinguish_step
+        self._ignition_step = np.full((width, height), -1, dtype=np.int32)
+        self._extinguish_step = np.full((width, height), -1, dtype=np.int32)
+
+        # Árvores em chamas e índice espacial do fogo compartilhado pelos bombeiros
+        self.burning_trees = {}
+        self.fire_index = SpatialIndex(width, height)
+        # Todas as células em chamas (árvores e grama), consultadas pelas cidades para evacuar
+        self.evacuation_radius = evacuation_radius
+        self.fire_cells = SpatialIndex(width, height, bucket_size=max(1, math.ceil(evacuation_radius)))
 
-        self.datacollector = mesa.DataCollector(
+        # Bombardeiros e madeireiros; com police_field=True (e algum policial) os policiais
+        # compartilham um campo de distâncias até eles, recalculado uma vez por passo
+        self.criminals = []
+        self.police_field = DistanceField(width, height, moore=False) if police_field and num_policiais > 0 else None
+        self._police_field_step = None
+
+        # Mapa da cidade segura (não evacuada) mais próxima, usado pelos cidadãos; só é
+        # calculado na primeira consulta e depois só a região afetada é refeita quando uma cidade é evacuada
+        self.city_field = DistanceField(width, height, moore=True)
+        self._safe_cities = Counter()  # Cidades não evacuadas por posição
+
+        # Passo em que a chuva já foi aplicada
+        self._rain_step = None
+
+        self.datacollector = ColumnarDataCollector(
             {
                 "Fine": lambda m: self.count_type(m, "Fine"),
                 "On Fire": lambda m: self.count_type(m, "On Fire"),
@@ -23,28 +82,33 @@ class ForestFire(mesa.Model):
                 "Bombed": lambda m: self.count_type(m, "Bombed"),
                 "Cut": lambda m: self.count_type(m, "Cut"),
                 "BurnedFraction": lambda m: m.count_type(m, "Burned Out") / (m.grid.width * m.grid.height)
-            }
+            },
+            # sink: caminho (.csv, .parquet, .arrow) ou objeto de sinks.py para gravar os passos em disco
+            sink=open_sink(sink) if isinstance(sink, str) else sink,
+            window=window,
+            chunk_size=chunk_size,  # Linhas acumuladas antes de cada gravação no sink
         )
 
-        # Criando agentes no grid
-        for contents, (x, y) in self.grid.coord_iter():
-            if self.random.random() < density:
-                new_tree = TreeCell((x, y), self, self.prob_de_sobrevivencia)
-                if x == 0:  # Vamos começar o fogo na posição (0, y)
-                    new_tree.condition = "On Fire"
-                self.grid.place_agent(new_tree, (x, y))
-                self.schedule.add(new_tree)
-
-            elif self.random.random() < city_probability:
-                city = CityCell((x, y), self)
-                self.grid.place_agent(city, (x, y))
-                self.schedule.add(city)
-            
-            elif self.random.random() < grass_probability:  
-                grass = GrassCell((x, y), self)
-                self.grid.place_agent(grass, (x, y))
-                self.schedule.add(grass)
-        
+        # Criando a paisagem: as máscaras de toda a grade são sorteadas de uma vez (ver landscape.py);
+        # árvores e grama vão direto para os arrays, as cidades são agentes.
+        # landscape_cache: LandscapeCache (por exemplo CACHE_PAISAGENS) ou diretório para reaproveitar
+        # paisagens já sorteadas com a mesma semente; None (padrão) sorteia sempre
+        semente_paisagem = self.random.getrandbits(64)
+        if isinstance(landscape_cache, str):
+            landscape_cache = LandscapeCache(directory=landscape_cache)
+        parametros = ((width, height), density, city_probability, grass_probability)
+        if landscape_cache is not None and landscape_cache is not False:
+            tree, cities, grass, extra_cities = landscape_cache.masks(semente_paisagem, *parametros)
+        else:
+            tree, cities, grass, extra_cities = sortear_paisagem(np.random.default_rng(semente_paisagem), *parametros)
+        self.vegetation[:] = vegetation_array(tree, grass)
+        self.condition[self.vegetation != EMPTY] = FINE
+        self.survival[tree] = self.prob_de_sobrevivencia
+        self.condition_counts[FINE] += int(np.count_nonzero(self.vegetation))
+        for y in np.flatnonzero(tree[0]).tolist():
+            self.grid.landscape_cell((0, y)).set_code(ON_FIRE)  # Vamos começar o fogo na posição (0, y)
+        self.add_cities(cities)
+
         for _ in range(num_pessoas):
             x = self.random.randint(0, self.grid.height - 1)
             y = self.random.randint(0, self.grid.height - 1)
@@ -79,6 +143,7 @@ class ForestFire(mesa.Model):
             )
             self.grid.place_agent(new_Bomber, (x, y))
             self.schedule.add(new_Bomber)
+            self.criminals.append(new_Bomber)
 
         # Place loggers in the grid
         for _ in range(num_loggers):
@@ -87,6 +152,7 @@ class ForestFire(mesa.Model):
             new_logger = Logger((x, y), self)
             self.grid.place_agent(new_logger, (x, y))
             self.schedule.add(new_logger)
+            self.criminals.append(new_logger)
 
         for _ in range(qtd_chuva):
             x = self.random.randint(0, self.grid.width - 1)
@@ -98,42 +164,290 @@ class ForestFire(mesa.Model):
         self.running = True
         self.datacollector.collect(self)
 
-        for contents, (x, y) in self.grid.coord_iter():
-            # Existing code for placing TreeCell, CityCell, GrassCell
-            if self.random.random() < city_probability:
-                city = CityCell((x, y), self)
-                self.grid.place_agent(city, (x, y))
-                self.schedule.add(city)
+        self.add_cities(extra_cities)
+
+        # recorder: caminho ou HistoryRecorder para gravar o histórico da grade (ver recorder.py)
+        self.recorder = HistoryRecorder(recorder) if isinstance(recorder, str) else recorder
+        if self.recorder is not None:
+            self.start_recorder()
+
+    def add_cities(self, mask):
+        """
+        Cria uma CityCell em cada célula de `mask` (array booleano (width, height)), em ordem de x e y.
+        """
+        cities = [CityCell((x, y), self) for x, y in np.argwhere(mask).tolist()]
+        self.grid.place_agents(cities)
+        for city in cities:
+            self.schedule.add(city)
 
     def step(self):
         """
         Avança o modelo por um passo.
         """
+        self.current_step += 1
         self.schedule.step()
+        if self.debug:
+            self.check_counts()
+        if self.recorder is not None:
+            self.recorder.end_step(self.current_step, self._mobile_positions())
+
         # Coleta dados
         self.datacollector.collect(self)
 
         # Interrompe se não houver mais fogo
-        if self.count_type(self, "On Fire") == 0:
+        if self.condition_counts[ON_FIRE] == 0:
             self.running = False
             
-        if any(agent.condition in ["On Fire", "Burned Out"] and agent.pos[0] == self.grid.width - 1
-               for agent in self.schedule.agents if isinstance(agent, TreeCell)):
-            self.edge_reached = True
-
-        if self.count_type(self, "On Fire") == 0 or self.edge_reached:
+        if self.condition_counts[ON_FIRE] == 0 or self.edge_reached:
             self.running = False
+            # Fim da execução: grava no sink as linhas que faltam
+            self.close()
+
+    def run_model(self):
+        """Roda o modelo até parar e fecha o sink e o recorder, mesmo se um passo falhar."""
+        try:
+            while self.running:
+                self.step()
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Grava no sink as linhas pendentes e fecha o sink e o recorder. É chamado ao fim da
+        execução e por run_model; quem para o modelo antes (max_steps, batch_run, servidor)
+        deve chamá-lo ou usar o modelo num bloco `with`. Pode ser chamado mais de uma vez.
+        """
+        self.datacollector.close()
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def condition_changed(self, agent, antiga, nova):
+        """
+        Chamado pelas células da paisagem sempre que a condição muda; antiga e nova são
+        códigos de `conditions` (antiga é EMPTY quando a célula acaba de ser criada).
+        """
+        if antiga != EMPTY:
+            self.condition_counts[antiga] -= 1
+        self.condition_counts[nova] += 1
+        if self.recorder is not None:
+            self.recorder.cell_changed(agent.pos, nova)
+
+        if isinstance(agent, CityCell):
+            self.city_condition_changed(agent.pos, antiga, nova)
+        elif nova == ON_FIRE:
+            self.fire_cells.add(agent.pos)
+            if self._ignition_step[agent.pos] < 0:
+                self._ignition_step[agent.pos] = self.current_step
+        elif antiga == ON_FIRE:
+            self.fire_cells.discard(agent.pos)
+            self._extinguish_step[agent.pos] = self.current_step
+
+        if isinstance(agent, TreeCell):
+            if nova == ON_FIRE:
+                self.burning_trees[agent] = None
+                self.fire_index.add(agent.pos)
+            elif antiga == ON_FIRE:
+                self.burning_trees.pop(agent, None)
+                self.fire_index.discard(agent.pos)
+            if nova == ON_FIRE or nova == BURNED_OUT:
+                self.fire_reached(agent.pos)
+        if isinstance(self.schedule, FrontierActivation):
+            self.schedule.condition_changed(agent, antiga, nova)
+
+    @property
+    def ignition_step(self):
+        """
+        Array (width, height) somente leitura com o passo em que cada árvore ou grama
+        pegou fogo pela primeira vez (0 para o fogo inicial, -1 se nunca queimou).
+        """
+        view = self._ignition_step.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def extinguish_step(self):
+        """
+        Array (width, height) somente leitura com o último passo em que o fogo de cada célula
+        acabou: queimou por completo, foi apagado por bombeiros ou pela chuva (-1 se nunca).
+        """
+        view = self._extinguish_step.view()
+        view.flags.writeable = False
+        return view
+
+    def start_recorder(self):
+        """
+        Grava o estado inicial da paisagem e das posições dos agentes móveis no recorder.
+        Os agentes móveis são os que já estão no modelo neste momento.
+        """
+        city = np.full((self.grid.width, self.grid.height), EMPTY, dtype=np.int8)
+        self._mobile_agents = []
+        for agent in self.schedule.agents:
+            if isinstance(agent, CityCell):
+                city[agent.pos] = agent.code
+            elif not isinstance(agent, LandscapeCell):
+                self._mobile_agents.append(agent)
+        self.recorder.start(self.vegetation, self.condition, city, self._mobile_positions())
 
+    def _mobile_positions(self):
+        """Índice da célula de cada agente móvel (-1 fora da grade)."""
+        return [agent.pos[0] * self.grid.height + agent.pos[1] if agent.pos is not None else -1
+                for agent in self._mobile_agents]
 
+    def apply_rain(self):
+        """
+        Aplica a chuva às árvores em chamas. É chamado por cada Chuva ativa, mas as regras são
+        aplicadas uma única vez por passo: as vizinhanças de todas as árvores em chamas são
+        contadas numa só passada e só depois as condições são alteradas.
+        """
+        if self._rain_step == self.schedule.steps:
+            return
+        self._rain_step = self.schedule.steps
+
+        novas_condicoes = []
+        for tree in self.burning_trees:
+            vizi_saudaveis = 0
+            vizi_chamas = 0
+            vizi_queimadas = 0
+            for neighbor in self.grid.iter_neighbors(tree.pos, moore=True, include_center=False):
+                if neighbor.code == FINE:
+                    vizi_saudaveis += 1
+                elif neighbor.code == ON_FIRE:
+                    vizi_chamas += 1
+                else:
+                    vizi_queimadas += 1
+
+            if vizi_saudaveis > 4 or vizi_queimadas > 4:
+                novas_condicoes.append((tree, FINE))
+            elif vizi_chamas > 4:
+                novas_condicoes.append((tree, BURNED_OUT))
+
+        for tree, code in novas_condicoes:
+            tree.set_code(code)
+
+    def fire_near(self, pos):
+        """
+        Verifica se há fogo a até `evacuation_radius` células (distância euclidiana) da posição,
+        sem contar a própria célula.
+        """
+        return self.fire_cells.any_within(pos, self.evacuation_radius)
+
+    def nearest_fire(self, pos):
+        """
+        Posição da árvore em chamas mais próxima (vizinhança de Moore) ou None se não houver fogo.
+        O índice é atualizado a cada ignição ou fogo apagado, então a resposta está sempre em dia.
+        """
+        return self.fire_index.nearest(pos)
+
+    def city_condition_changed(self, pos, antiga, nova):
+        """
+        Mantém as cidades seguras no mapa da cidade mais próxima.
+        """
+        if antiga != EMPTY and antiga != EVACUATED:
+            self._safe_cities[pos] -= 1
+            if self._safe_cities[pos] == 0:
+                self.city_field.remove_source(pos)
+        if nova != EVACUATED:
+            self._safe_cities[pos] += 1
+            if self._safe_cities[pos] == 1:
+                self.city_field.add_source(pos)
+
+    def nearest_safe_city(self, pos):
+        """
+        Posição da cidade não evacuada mais próxima (vizinhança de Moore) ou None se não houver.
+        """
+        self.city_field.update()
+        return self.city_field.nearest(pos)
+
+    def path_to_criminal(self, pos):
+        """
+        Caminho (deque de posições, começando em pos) até o Bombardeiro ou Logger não capturado
+        mais próximo, seguindo o campo de distâncias compartilhado pelos policiais.
+        """
+        field = self.police_field
+        if self._police_field_step != self.schedule.steps:
+            alvos = [agent.pos for agent in self.criminals if not agent.captured]
+            if not alvos:
+                return deque()  # Nenhum alvo disponível: o campo nem é calculado
+            field.rebuild(alvos)
+            self._police_field_step = self.schedule.steps
+
+        i = field.index(pos)
+        if field.dist[i] == INF:
+            return deque()  # Nenhum alvo disponível
+        path = deque([pos])
+        while field.dist[i] > 0:
+            # Desce o gradiente do campo: qualquer vizinho um passo mais perto de um alvo
+            i = next(j for j in field.neighbors(i) if field.dist[j] == field.dist[i] - 1)
+            path.append(field.pos(i))
+        return path
+
+    def fire_reached(self, pos):
+        """
+        Registra que o fogo chegou a uma árvore na posição dada.
+        """
+        x, y = pos
+        if x > self.max_x_reached:
+            self.max_x_reached = x
+        if x == 0:
+            self.edges_reached["left"] = True
+        if x == self.grid.width - 1:
+            self.edges_reached["right"] = True
+            self.edge_reached = True  # Percolação: o fogo atravessou a floresta
+        if y == 0:
+            self.edges_reached["bottom"] = True
+        if y == self.grid.height - 1:
+            self.edges_reached["top"] = True
 
     @staticmethod
     def count_type(model, condition):
-        count = 0
+        return model.condition_counts[CONDITION_CODES[condition]]
+
+    def check_counts(self):
+        """
+        Confere os contadores com uma contagem completa dos agentes (modo debug).
+        """
+        for condition in ["Fine", "On Fire", "Burned Out", "Evacuated", "Fire Off", "Bombed", "Cut"]:
+            esperado = self.count_type_scan(self, condition)
+            if self.count_type(self, condition) != esperado:
+                raise RuntimeError(
+                    f"Contador de '{condition}' = {self.count_type(self, condition)}, contagem completa = {esperado}"
+                )
+
+    @staticmethod
+    def count_type_scan(model, condition):
+        code = CONDITION_CODES[condition]
+        count = int(np.count_nonzero(model.condition == code))  # Árvores e grama
         for agent in model.schedule.agents:
-            if isinstance(agent, TreeCell) and agent.condition == condition:
-                count += 1
-            elif isinstance(agent, CityCell) and agent.condition == condition:
+            if isinstance(agent, CityCell) and agent.code == code:
                 count += 1
-            elif isinstance(agent,GrassCell) and agent.condition == condition:
-                count +=1
         return count
+
+
+# Motores disponíveis para o mesmo cenário
+ENGINES = {"agents": ForestFire, "vectorized": VectorizedForestFire}
+
+
+def classe_do_motor(engine):
+    """Classe do modelo de um motor de ENGINES; levanta ValueError para um nome desconhecido."""
+    if engine not in ENGINES:
+        raise ValueError(f"Motor desconhecido: '{engine}' (use {', '.join(ENGINES)})")
+    return ENGINES[engine]
+
+
+def criar_forest_fire(engine="agents", **kwargs):
+    """
+    Cria o modelo com o motor escolhido.
+    Args:
+        engine: "agents" (ForestFire) ou "vectorized" (VectorizedForestFire, só paisagem e chuva:
+            as quantidades de agentes móveis devem ser 0).
+        kwargs: Parâmetros do construtor do motor.
+    Returns:
+        O modelo criado.
+    """
+    return classe_do_motor(engine)(**kwargs)
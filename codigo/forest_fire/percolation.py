@@ -0,0 +1,147 @@
+"""
+Percolação de sítios pelo algoritmo de Newman–Ziff.
+
+Em vez de criar um ForestFire para cada densidade, cada varredura coloca as
+árvores uma a uma, numa ordem aleatória, e junta os aglomerados vizinhos
+(vizinhança de Moore, a mesma da propagação do fogo) numa estrutura
+union-find. Uma única varredura dá, para todo número n de árvores, se algum
+aglomerado liga a coluna 0 à última coluna (o fogo aceso na coluna 0 chega à
+borda oposta) e o tamanho do maior aglomerado. As médias sobre as varreduras
+são convertidas para densidades com a distribuição binomial do número de
+árvores, como no ForestFire, em que cada célula recebe uma árvore com
+probabilidade `density`.
+"""
+import numpy as np
+import pandas as pd
+
+from fields import MOORE
+
+ESQUERDA, DIREITA = 1, 2  # Bordas tocadas por um aglomerado
+
+
+def newman_ziff_sweep(width, height, rng):
+    """
+    Uma varredura de Newman–Ziff sobre uma grade width x height.
+    Args:
+        rng: numpy.random.Generator que sorteia a ordem das árvores.
+    Returns:
+        (n, largest): n é o número de árvores em que um aglomerado passa a ligar as colunas
+        0 e width - 1; largest[k] é o tamanho do maior aglomerado com k árvores (k = 0..N).
+    """
+    num_cells = width * height
+    parent = list(range(num_cells))
+    size = [0] * num_cells  # 0 = célula ainda sem árvore
+    edges = [0] * num_cells
+    largest = np.zeros(num_cells + 1, dtype=np.int32)
+    maior = 0
+    spanning_at = None
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # Compressão de caminho pela metade
+            i = parent[i]
+        return i
+
+    for k, i in enumerate(rng.permutation(num_cells).tolist(), start=1):
+        x, y = divmod(i, height)
+        size[i] = 1
+        edges[i] = (ESQUERDA if x == 0 else 0) | (DIREITA if x == width - 1 else 0)
+        raiz = i
+        for dx, dy in MOORE:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height:
+                j = nx * height + ny
+                if size[j]:
+                    outra = find(j)
+                    if outra != raiz:
+                        # União pelo tamanho: a raiz do aglomerado menor aponta para a do maior
+                        if size[outra] > size[raiz]:
+                            raiz, outra = outra, raiz
+                        parent[outra] = raiz
+                        size[raiz] += size[outra]
+                        edges[raiz] |= edges[outra]
+        maior = max(maior, size[raiz])
+        largest[k] = maior
+        if spanning_at is None and edges[raiz] == ESQUERDA | DIREITA:
+            spanning_at = k
+
+    return spanning_at, largest
+
+
+def binomial_weights(num_cells, density):
+    """Probabilidade de haver n = 0..num_cells árvores quando cada célula tem uma com probabilidade density."""
+    n = np.arange(num_cells + 1)
+    if density <= 0 or density >= 1:
+        return (n == (num_cells if density >= 1 else 0)).astype(float)
+    log_fatorial = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, num_cells + 1)))])
+    log_pesos = (log_fatorial[num_cells] - log_fatorial[n] - log_fatorial[num_cells - n]
+                 + n * np.log(density) + (num_cells - n) * np.log1p(-density))
+    return np.exp(log_pesos)
+
+
+def percolation_sweeps(width, height, densities, sweeps=100, seed=None):
+    """
+    Probabilidade de o fogo atravessar a grade e fração do maior aglomerado para todas as densidades.
+    Args:
+        width, height: Dimensões da grade.
+        densities: Densidades em que os resultados são avaliados.
+        sweeps: Número de varreduras (ordens aleatórias) na média.
+        seed: Semente do numpy.random.Generator.
+    Returns:
+        pd.DataFrame com Density, SpreadProbability e LargestClusterFraction.
+    """
+    rng = np.random.default_rng(seed)
+    num_cells = width * height
+    spanning = np.zeros(num_cells + 1)
+    largest = np.zeros(num_cells + 1)
+    for _ in range(sweeps):
+        spanning_at, maiores = newman_ziff_sweep(width, height, rng)
+        spanning[spanning_at:] += 1
+        largest += maiores
+    spanning /= sweeps
+    largest /= sweeps * num_cells
+
+    results = []
+    for density in densities:
+        pesos = binomial_weights(num_cells, density)
+        results.append({
+            "Density": density,
+            "SpreadProbability": float(pesos @ spanning),
+            "LargestClusterFraction": float(pesos @ largest),
+        })
+    return pd.DataFrame(results)
+
+
+def burn_times(tree, sources):
+    """
+    Passo em que o fogo chega a cada árvore quando toda vizinha de uma árvore em chamas pega fogo
+    (percolação pura, com a atualização síncrona do VectorizedForestFire).
+
+    A busca em largura avança uma camada por passo, com as operações de cada camada
+    feitas sobre a fronteira inteira de uma vez.
+    Args:
+        tree: Máscara (width, height) das árvores.
+        sources: Máscara das árvores em chamas no passo 0.
+    Returns:
+        Array int32 (width, height) com o passo de ignição de cada árvore (-1 = o fogo não chega).
+    """
+    width, height = tree.shape
+    times = np.full(width * height, -1, dtype=np.int32)
+    livre = tree.ravel().copy()
+    fronteira = np.flatnonzero(sources.ravel() & livre)
+    livre[fronteira] = False
+    times[fronteira] = 0
+    t = 0
+    while fronteira.size:
+        t += 1
+        x, y = np.divmod(fronteira, height)
+        vizinhas = []
+        for dx, dy in MOORE:
+            nx, ny = x + dx, y + dy
+            dentro = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+            vizinhas.append(nx[dentro] * height + ny[dentro])
+        vizinhas = np.concatenate(vizinhas)
+        fronteira = np.unique(vizinhas[livre[vizinhas]])
+        livre[fronteira] = False
+        times[fronteira] = t
+    return times.reshape(width, height)
@@ -0,0 +1,186 @@
+"""
+Gravação do histórico da grade em arquivo, por diferenças entre passos.
+
+Cada passo grava só as células cuja condição mudou (índice da célula e novo
+código de `conditions`) e os agentes móveis que mudaram de posição. A cada
+`keyframe_interval` passos é gravado o estado completo, e o HistoryReader
+reconstrói qualquer passo a partir do último keyframe anterior a ele.
+
+Formato: um cabeçalho com as dimensões, o número de agentes móveis e a
+vegetação (que não muda), seguido de um quadro por passo. Cada quadro tem um
+cabeçalho fixo (tipo, passo, células, movimentos, bytes) e o conteúdo
+comprimido com zlib.
+"""
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from conditions import CITY, EVACUATED
+
+MAGIC = b"FFHIST1\n"
+HEADER = struct.Struct("<IIII")  # width, height, agentes móveis, keyframe_interval
+FRAME = struct.Struct("<BIIII")  # tipo, passo, células, movimentos, bytes do conteúdo
+KEYFRAME, DELTA = 0, 1
+
+
+class HistoryRecorder:
+    """Grava o histórico de um modelo em `path`."""
+
+    def __init__(self, path, keyframe_interval=100):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self._file = None
+        self._pending = {}  # (índice, camada da cidade?) -> código, mudanças do passo atual
+
+    def start(self, vegetation, condition, city, positions):
+        """
+        Abre o arquivo e grava o estado inicial (passo 0).
+        Args:
+            vegetation, condition, city: Arrays (width, height) com os códigos da paisagem.
+            positions: Índice da célula de cada agente móvel (-1 fora da grade).
+        """
+        self.width, self.height = vegetation.shape
+        self.condition = np.array(condition, dtype=np.int8).ravel()
+        self.city = np.array(city, dtype=np.int8).ravel()
+        self.positions = np.array(positions, dtype=np.int32)
+
+        self._file = open(self.path, "wb")
+        self._file.write(MAGIC)
+        self._file.write(HEADER.pack(self.width, self.height, len(self.positions), self.keyframe_interval))
+        self._file.write(np.ascontiguousarray(vegetation, dtype=np.int8).tobytes())
+        self._write_keyframe(0)
+
+    def cell_changed(self, pos, code):
+        """Registra a nova condição (código) de uma célula da paisagem no passo atual."""
+        if self._file is None:
+            return
+        self._pending[(pos[0] * self.height + pos[1], code in (CITY, EVACUATED))] = code
+
+    def end_step(self, step, positions, condition=None, city=None):
+        """
+        Fecha o passo: grava as mudanças acumuladas, ou um keyframe a cada `keyframe_interval` passos.
+        Args:
+            step: Número do passo que terminou.
+            positions: Índice da célula de cada agente móvel.
+            condition, city: Estado completo da paisagem, para modelos sem `cell_changed`
+                (o VectorizedForestFire); as mudanças são obtidas comparando com o passo anterior.
+        """
+        if condition is None:
+            cells = np.array([i for i, _ in self._pending], dtype=np.int32)
+            codes = np.array(list(self._pending.values()), dtype=np.int8)
+            layers = np.array([layer for _, layer in self._pending], dtype=bool)
+            self._pending = {}
+        else:
+            condition, city = condition.ravel(), city.ravel()
+            mudou = np.flatnonzero(condition != self.condition)
+            mudou_cidade = np.flatnonzero(city != self.city)
+            cells = np.concatenate([mudou, mudou_cidade]).astype(np.int32)
+            codes = np.concatenate([condition[mudou], city[mudou_cidade]]).astype(np.int8)
+            layers = np.arange(len(cells)) >= len(mudou)
+        self.condition[cells[~layers]] = codes[~layers]
+        self.city[cells[layers]] = codes[layers]
+
+        positions = np.asarray(positions, dtype=np.int32)
+        moved = np.flatnonzero(positions != self.positions).astype(np.int32)
+        self.positions = positions.copy()
+
+        if step % self.keyframe_interval == 0:
+            self._write_keyframe(step)
+        else:
+            payload = cells.tobytes() + codes.tobytes() + moved.tobytes() + positions[moved].tobytes()
+            self._write_frame(DELTA, step, len(cells), len(moved), payload)
+
+    def _write_keyframe(self, step):
+        payload = self.condition.tobytes() + self.city.tobytes() + self.positions.tobytes()
+        self._write_frame(KEYFRAME, step, self.condition.size, len(self.positions), payload)
+
+    def _write_frame(self, kind, step, num_cells, num_moves, payload):
+        payload = zlib.compress(payload, 1)
+        self._file.write(FRAME.pack(kind, step, num_cells, num_moves, len(payload)))
+        self._file.write(payload)
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class HistoryState:
+    """Estado da grade num passo: arrays (width, height) e posições (x, y) dos agentes móveis."""
+
+    def __init__(self, step, vegetation, condition, city, positions, height):
+        self.step = step
+        self.vegetation = vegetation
+        self.condition = condition
+        self.city = city
+        self.positions = [divmod(int(i), height) if i >= 0 else None for i in positions]
+
+
+class HistoryReader:
+    """
+    Lê um arquivo gravado pelo HistoryRecorder e reconstrói o estado de qualquer passo.
+    Um arquivo de uma execução interrompida é lido até o último quadro completo.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} não é um histórico do ForestFire")
+            self.width, self.height, self.num_agents, self.keyframe_interval = HEADER.unpack(f.read(HEADER.size))
+            self.vegetation = np.frombuffer(f.read(self.width * self.height), dtype=np.int8).reshape(self.width, self.height)
+
+            # Índice dos quadros: passo -> (tipo, células, movimentos, posição do conteúdo, bytes)
+            self.frames = {}
+            tamanho = os.fstat(f.fileno()).st_size
+            while True:
+                header = f.read(FRAME.size)
+                if len(header) < FRAME.size:
+                    break
+                kind, step, num_cells, num_moves, size = FRAME.unpack(header)
+                offset = f.tell()
+                if offset + size > tamanho:
+                    break
+                f.seek(size, 1)
+                self.frames[step] = (kind, num_cells, num_moves, offset, size)
+
+    @property
+    def steps(self):
+        """Número do último passo gravado."""
+        return max(self.frames)
+
+    def _payload(self, f, offset, size):
+        f.seek(offset)
+        return zlib.decompress(f.read(size))
+
+    def state_at(self, step):
+        """Reconstrói o estado no passo dado a partir do último keyframe anterior."""
+        if step not in self.frames:
+            raise KeyError(f"Passo {step} não foi gravado")
+        start = max(s for s, frame in self.frames.items() if frame[0] == KEYFRAME and s <= step)
+        n = self.width * self.height
+
+        with open(self.path, "rb") as f:
+            _, _, _, offset, size = self.frames[start]
+            data = self._payload(f, offset, size)
+            condition = np.frombuffer(data, dtype=np.int8, count=n).copy()
+            city = np.frombuffer(data, dtype=np.int8, count=n, offset=n).copy()
+            positions = np.frombuffer(data, dtype=np.int32, offset=2 * n).copy()
+
+            for s in range(start + 1, step + 1):
+                _, num_cells, num_moves, offset, size = self.frames[s]
+                data = self._payload(f, offset, size)
+                cells = np.frombuffer(data, dtype=np.int32, count=num_cells)
+                codes = np.frombuffer(data, dtype=np.int8, count=num_cells, offset=4 * num_cells)
+                moves = np.frombuffer(data, dtype=np.int32, count=2 * num_moves, offset=5 * num_cells)
+                layers = (codes == CITY) | (codes == EVACUATED)
+                condition[cells[~layers]] = codes[~layers]
+                city[cells[layers]] = codes[layers]
+                positions[moves[:num_moves]] = moves[num_moves:]
+
+        return HistoryState(step, self.vegetation, condition.reshape(self.width, self.height),
+                            city.reshape(self.width, self.height), positions, self.height)
+
@@ -0,0 +1,103 @@
+import heapq
+import mesa
+from conditions import ON_FIRE
+
+
+class FrontierActivation(mesa.time.RandomActivation):
+    """
+    Ativação aleatória guiada pela frente de fogo.
+
+    As células passivas (árvores e grama) só fazem algo no `step` quando estão
+    "On Fire", então só essas são ativadas; os demais agentes são ativados todo
+    passo. As células passivas não são registradas no schedule: elas ficam nos
+    arrays do modelo e o schedule só guarda as que estão em chamas. O custo de
+    um passo passa a depender do tamanho da frente de fogo e não da área da grade.
+
+    A ordem é a mesma do RandomActivation: cada agente recebe uma chave aleatória
+    e os agentes são ativados em ordem crescente de chave. Uma célula incendiada
+    durante o passo sorteia a sua chave na hora e só é ativada neste passo se a
+    chave for maior que a do agente atual, como aconteceria se ela estivesse na
+    fila embaralhada desde o início.
+    """
+
+    def __init__(self, model, passive=()):
+        """
+        Args:
+            model: Instância do modelo.
+            passive: Classes de agentes que só são ativados enquanto estão em chamas.
+        """
+        super().__init__(model)
+        self.passive = tuple(passive)
+        self.always_active = {}  # Agentes ativados todo passo, em ordem de inserção
+        self.burning = {}  # Células passivas em chamas
+        self._fila = None
+        self._chaves = None
+        self._chave_atual = 0.0
+        self._contador = 0
+
+    def add(self, agent):
+        if not isinstance(agent, self.passive):
+            super().add(agent)
+            self.always_active[agent] = None
+        elif agent.code == ON_FIRE:
+            self.burning[agent] = None
+
+    def remove(self, agent):
+        if not isinstance(agent, self.passive):
+            super().remove(agent)
+        self.always_active.pop(agent, None)
+        self.burning.pop(agent, None)
+
+    def condition_changed(self, agent, antiga, nova):
+        """Atualiza o conjunto de células em chamas quando uma célula muda de condição (códigos)."""
+        if not isinstance(agent, self.passive):
+            return
+        if nova == ON_FIRE:
+            self.burning[agent] = None
+            if self._fila is not None and agent not in self._chaves:
+                self._agendar(agent, self._chave_atual)
+        elif antiga == ON_FIRE:
+            self.burning.pop(agent, None)
+
+    def _agendar(self, agent, depois_de=-1.0):
+        """Sorteia a chave do agente e o coloca na fila se ainda não passou a vez dele."""
+        chave = self.model.random.random()
+        self._chaves[agent] = chave
+        if chave > depois_de:
+            self._contador += 1
+            heapq.heappush(self._fila, (chave, self._contador, agent))
+
+    def step(self):
+        """Ativa os agentes sempre ativos e as células em chamas, em ordem aleatória."""
+        self._fila = []
+        self._chaves = {}
+        for agent in list(self.always_active) + list(self.burning):
+            self._agendar(agent)
+
+        while self._fila:
+            self._chave_atual, _, agent = heapq.heappop(self._fila)
+            agent.step()
+
+        self._fila = None
+        self._chaves = None
+        self._chave_atual = 0.0
+        self.steps += 1
+        self.time += 1
+
+
+class LandscapeActivation(mesa.time.RandomActivation):
+    """
+    Ativação aleatória de todos os agentes e de todas as células da paisagem (frontier=False).
+
+    As árvores e a grama ficam nos arrays do modelo e não são registradas no
+    schedule, então as visões delas são pedidas à grade a cada passo e ativadas
+    junto com os demais agentes, numa única ordem aleatória.
+    """
+
+    def step(self):
+        agents = list(self._agents) + list(self.model.grid.landscape_cells())
+        self.model.random.shuffle(agents)
+        for agent in agents:
+            agent.step()
+        self.steps += 1
+        self.time += 1
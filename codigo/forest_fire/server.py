@@ -1,6 +1,9 @@
 import mesa
+import numpy as np
 from agent import TreeCell, CityCell, GrassCell, GroundFirefighter, AerialFirefighter, Police, Bomber, Logger, Citizen, Clima, Chuva  # Importando as classes TreeCell, CityCell, GrassCell e Bombeiros
-from model import ForestFire  # Importando o modelo de incêndio florestal 
+from model import criar_forest_fire  # Importando o modelo de incêndio florestal 
+from conditions import CONDITION_NAMES, TREE, GRASS
+from landscape import CACHE_PAISAGENS
 
 # Definindo as cores para as condições das células
 COLORS = {
@@ -193,16 +196,63 @@ model_params = {
     "num_policiais": mesa.visualization.Slider("Número de Policiais", 5, 0, 20, 1),
     "num_bombers": mesa.visualization.Slider("Número de Bombardeiros", 3, 0, 20, 1),
     "num_loggers": mesa.visualization.Slider("Número de Madeireiros", 2, 0, 20, 1),
+    # 0 (ou o campo vazio) sorteia uma floresta nova a cada "Reset"
+    "semente": mesa.visualization.NumberInput("Semente (0 = aleatória)", 0),
+    "engine": mesa.visualization.Choice("Motor (vectorized ignora os agentes móveis)", value="agents", choices=["agents", "vectorized"]),
 }
 
+# Parâmetros dos agentes móveis, que o motor vetorizado não simula
+AGENTES_MOVEIS = ("num_pessoas", "num_helicoptero", "num_policiais", "num_bombers", "num_loggers")
+
+
+def criar_modelo(semente=0, engine="agents", **kwargs):
+    """
+    Cria o modelo do servidor com o motor escolhido. Com uma semente diferente de 0 o "Reset" refaz
+    a mesma floresta; no ForestFire a paisagem é reaproveitada de CACHE_PAISAGENS (ver landscape.py).
+    """
+    if engine == "vectorized":
+        # Os sliders dos agentes móveis continuam na página; o rótulo do motor avisa que são ignorados
+        for nome in AGENTES_MOVEIS:
+            kwargs.pop(nome, None)
+    elif semente:
+        kwargs["landscape_cache"] = CACHE_PAISAGENS
+    if semente:
+        kwargs["seed"] = int(semente)
+    return criar_forest_fire(engine, **kwargs)
+
+
+class LandscapeCanvasGrid(mesa.visualization.CanvasGrid):
+    """
+    CanvasGrid que também desenha o VectorizedForestFire, que não tem `grid`: as células são
+    lidas dos arrays da paisagem, com as mesmas cores de forest_fire_portrayal.
+    """
+
+    def render(self, model):
+        if hasattr(model, "grid"):
+            return super().render(model)
+        grid_state = {0: []}
+        for (x, y), code in np.ndenumerate(model.city):
+            if code:
+                color = COLORS[CONDITION_NAMES[code]]
+                grid_state[0].append({"Shape": "rect", "w": 5, "h": 5, "Filled": "true", "Layer": 0, "Color": color, "x": x, "y": y})
+        for (x, y), code in np.ndenumerate(model.condition):
+            if model.vegetation[x, y] == TREE:
+                color = COLORS[CONDITION_NAMES[code]]
+            elif model.vegetation[x, y] == GRASS:
+                color = COLORS.get("Grass " + CONDITION_NAMES[code], "#000000")
+            else:
+                continue
+            grid_state[0].append({"Shape": "rect", "w": 1, "h": 1, "Filled": "true", "Layer": 0, "Color": color, "x": x, "y": y})
+        return grid_state
+
 # Canvas para visualização
-canvas_element = mesa.visualization.CanvasGrid(
+canvas_element = LandscapeCanvasGrid(
     forest_fire_portrayal, 100, 100, 500, 500
 )
 
 # Inicializando o servidor
 server = mesa.visualization.ModularServer(
-    ForestFire, [canvas_element, tree_chart, pie_chart], "Forest Fire com Cidades e Pessoas", model_params
+    criar_modelo, [canvas_element, tree_chart, pie_chart], "Forest Fire com Cidades e Pessoas", model_params
 )
 
 # Porta do servidor
@@ -0,0 +1,92 @@
+"""
+Destinos (sinks) para gravar em disco, em blocos, as variáveis do modelo durante a execução.
+
+Usados pelo ColumnarDataCollector: cada bloco de linhas já coletadas é entregue
+com `write(columns, start_row)` e pode ser descartado da memória em seguida.
+Cada bloco é gravado e descarregado no disco na hora, então o que já foi
+gravado continua legível mesmo se a execução for interrompida.
+"""
+import os
+
+import pandas as pd
+
+
+class CSVSink:
+    """Acrescenta os blocos a um arquivo CSV, com a coluna "Step" e o cabeçalho na primeira escrita."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "w", newline="")
+        self._header = True
+
+    def write(self, columns, start_row):
+        data = pd.DataFrame(columns, copy=False)
+        data.index = pd.RangeIndex(start_row, start_row + len(data), name="Step")
+        data.to_csv(self._file, header=self._header)
+        self._header = False
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink:
+    """
+    Grava cada bloco como um arquivo Parquet separado dentro de um diretório
+    (part-000000000.parquet, ...). Um arquivo Parquet só é legível depois de
+    fechado, então um arquivo por bloco mantém os blocos já gravados legíveis;
+    `pandas.read_parquet(diretorio)` lê todos juntos. Requer pyarrow.
+    """
+
+    def __init__(self, path):
+        import pyarrow  # noqa: F401  (dependência opcional, falha já na criação do sink)
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, columns, start_row):
+        data = pd.DataFrame(columns, copy=False)
+        data.insert(0, "Step", range(start_row, start_row + len(data)))
+        data.to_parquet(os.path.join(self.path, f"part-{start_row:09d}.parquet"), index=False)
+
+    def close(self):
+        pass
+
+
+class ArrowSink:
+    """
+    Grava os blocos como record batches num arquivo no formato de streaming
+    Arrow IPC; `pyarrow.ipc.open_stream` lê os blocos já gravados. Requer pyarrow.
+    """
+
+    def __init__(self, path):
+        import pyarrow as pa
+        self._pa = pa
+        self.path = path
+        self._file = pa.OSFile(path, "wb")
+        self._writer = None
+
+    def write(self, columns, start_row):
+        pa = self._pa
+        arrays = {"Step": pa.array(range(start_row, start_row + len(next(iter(columns.values())))), pa.int64())}
+        arrays.update((name, pa.array(values)) for name, values in columns.items())
+        batch = pa.RecordBatch.from_pydict(arrays)
+        if self._writer is None:
+            self._writer = pa.ipc.new_stream(self._file, batch.schema)
+        self._writer.write_batch(batch)
+        self._file.flush()
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._file.close()
+
+
+SINKS = {".csv": CSVSink, ".parquet": ParquetSink, ".arrow": ArrowSink}
+
+
+def open_sink(path):
+    """Escolhe o sink pela extensão do caminho (.csv, .parquet ou .arrow)."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f"Extensão de sink desconhecida: '{extension}' (use .csv, .parquet ou .arrow)")
+    return SINKS[extension](path)
@@ -0,0 +1,405 @@
+import math
+
+import mesa
+import numpy as np
+from collector import ColumnarDataCollector
+from sinks import open_sink
+from recorder import HistoryRecorder
+from percolation import burn_times
+from landscape import gerar_paisagem
+from conditions import EMPTY, FINE, ON_FIRE, BURNED_OUT, CITY, EVACUATED, TREE, GRASS, CONDITION_CODES
+
+# Deslocamentos (dx, dy) da vizinhança de Moore
+MOORE = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+# Probabilidades fixas usadas pela GrassCell
+PROB_GRAMA_RESISTIR = 0.1  # GrassCell.ajusta_probabilidade_por_vento
+PROB_GRAMA_ESPALHAR = 0.15  # GrassCell.step
+
+RAIO_EVACUACAO = 10
+FREQUENCIA_CHUVA = 0.4  # Chuva.frequencia: chance de uma nuvem continuar chovendo a cada passo
+
+
+def ajusta_probabilidade_por_vento(prob_de_sobrevivencia, vento, dx, dy):
+    """
+    Versão escalar de TreeCell.ajusta_probabilidade_por_vento.
+    Args:
+        prob_de_sobrevivencia: Probabilidade de a árvore sobreviver ao fogo.
+        vento: Direção do vento do modelo.
+        dx, dy: Posição da célula em chamas relativa à árvore.
+    Returns:
+        A probabilidade de sobrevivência ajustada pelo vento.
+    """
+    if vento == "Sem Direção":
+        return prob_de_sobrevivencia
+
+    incremento_vento = 0.7 if vento in ["Norte", "Sul"] else 0.5
+
+    if (vento == "Norte" and dy < 0) or (vento == "Sul" and dy > 0) \
+            or (vento == "Leste" and dx < 0) or (vento == "Oeste" and dx > 0):
+        return max(0, prob_de_sobrevivencia - incremento_vento)
+    return prob_de_sobrevivencia
+
+
+def deslocar(mask, dx, dy):
+    """
+    Desloca uma máscara booleana nos dois últimos eixos (x, y).
+    Returns:
+        Um array `out` com out[..., x, y] = mask[..., x + dx, y + dy] e False fora da grade.
+    """
+    out = np.zeros_like(mask)
+    width, height = mask.shape[-2:]
+    out[..., max(0, -dx):width - max(0, dx), max(0, -dy):height - max(0, dy)] = \
+        mask[..., max(0, dx):width - max(0, -dx), max(0, dy):height - max(0, -dy)]
+    return out
+
+
+def espalhar_fogo(vegetation, condition, rng, prob_de_sobrevivencia, vento):
+    """
+    Aplica TreeCell.step e GrassCell.step a todas as células de uma vez.
+
+    As células em chamas tentam incendiar cada vizinha "Fine" (um sorteio por par
+    queimando/vizinha, como nos agentes) e passam para "Burned Out". Os arrays podem
+    ter eixos extras à esquerda (réplicas); a grade ocupa os dois últimos eixos.
+    Args:
+        vegetation: Array com o tipo de vegetação (NO_VEGETATION, TREE, GRASS).
+        condition: Array com o código da condição; é atualizado no lugar.
+        rng: numpy.random.Generator usado nos sorteios.
+        prob_de_sobrevivencia: Probabilidade de a árvore sobreviver ao fogo.
+        vento: Direção do vento.
+    Returns:
+        A máscara das células incendiadas neste passo.
+    """
+    tree = vegetation == TREE
+    fine = condition == FINE
+    burning = condition == ON_FIRE
+    burning_tree = burning & tree
+    burning_grass = burning & (vegetation == GRASS)
+    ignite = np.zeros_like(fine)
+
+    for dx, dy in MOORE:
+        # Árvore em chamas: a vizinha pega fogo se o sorteio passar da probabilidade ajustada
+        alvos = fine & deslocar(burning_tree, dx, dy)
+        if alvos.any():
+            prob = ajusta_probabilidade_por_vento(prob_de_sobrevivencia, vento, dx, dy)
+            limiar = np.where(tree[alvos], prob, PROB_GRAMA_RESISTIR)
+            ignite[alvos] |= rng.random(limiar.size) > limiar
+
+        # Grama em chamas: probabilidade fixa para qualquer vizinha
+        alvos = fine & deslocar(burning_grass, dx, dy)
+        if alvos.any():
+            ignite[alvos] |= rng.random(np.count_nonzero(alvos)) < PROB_GRAMA_ESPALHAR
+
+    condition[burning] = BURNED_OUT
+    condition[ignite] = ON_FIRE
+    return ignite
+
+
+def aplicar_chuva(vegetation, condition, city):
+    """
+    Aplica as regras da Chuva a todas as árvores em chamas numa única passada.
+
+    Conta, para cada célula, quantas vizinhas estão "Fine", "On Fire" ou em outra
+    condição (cidades incluídas) e então: mais de 4 vizinhas em chamas -> "Burned Out";
+    mais de 4 saudáveis ou mais de 4 nas demais condições -> "Fine".
+    """
+    fine = condition == FINE
+    burning = condition == ON_FIRE
+    outras = ((condition != EMPTY) & ~fine & ~burning).astype(np.int8) + (city != EMPTY)
+    fine = fine.astype(np.int8)
+    burning_i = burning.astype(np.int8)
+
+    vizi_saudaveis = np.zeros(condition.shape, dtype=np.int8)
+    vizi_chamas = np.zeros(condition.shape, dtype=np.int8)
+    vizi_queimadas = np.zeros(condition.shape, dtype=np.int8)
+    for dx, dy in MOORE:
+        vizi_saudaveis += deslocar(fine, dx, dy)
+        vizi_chamas += deslocar(burning_i, dx, dy)
+        vizi_queimadas += deslocar(outras, dx, dy)
+
+    alvos = burning & (vegetation == TREE)
+    condition[alvos & (vizi_chamas > 4)] = BURNED_OUT
+    condition[alvos & ((vizi_saudaveis > 4) | (vizi_queimadas > 4))] = FINE
+
+
+def _offsets_do_raio(raio):
+    """Deslocamentos a uma distância euclidiana <= raio (que pode ser fracionário), sem o centro."""
+    alcance = math.ceil(raio)
+    return np.array([(dx, dy)
+                     for dx in range(-alcance, alcance + 1)
+                     for dy in range(-alcance, alcance + 1)
+                     if (dx, dy) != (0, 0) and dx * dx + dy * dy <= raio * raio], dtype=np.int64).reshape(-1, 2)
+
+
+def evacuar_cidades(city, condition, raio, offsets):
+    """
+    Evacua as cidades com alguma célula em chamas a até `raio` células; `offsets` vem de
+    _offsets_do_raio(raio). Como espalhar_fogo, aceita eixos de réplicas à esquerda.
+    """
+    cidades = np.nonzero(city == CITY)
+    fogo = np.nonzero(condition == ON_FIRE)
+    if cidades[0].size == 0 or fogo[0].size == 0:
+        return
+    # Índices planos numa cópia da grade com uma borda de `raio` células (arredondado para cima)
+    raio = math.ceil(raio)
+    forma = condition.shape[:-2] + (condition.shape[-2] + 2 * raio, condition.shape[-1] + 2 * raio)
+    desloc = offsets[:, 0] * forma[-1] + offsets[:, 1]
+
+    def planos(indices):
+        return np.ravel_multi_index(tuple(indices[:-2]) + (indices[-2] + raio, indices[-1] + raio), forma)
+
+    marcados = np.zeros(int(np.prod(forma)), dtype=bool)
+    if fogo[0].size < cidades[0].size:
+        # Menos fogo que cidades: marca o disco em volta de cada célula em chamas
+        marcados[(planos(fogo)[:, None] + desloc).ravel()] = True
+        evacuar = marcados[planos(cidades)]
+    else:
+        # Menos cidades que fogo: procura fogo no disco em volta de cada cidade
+        marcados[planos(fogo)] = True
+        evacuar = marcados[planos(cidades)[:, None] + desloc].any(axis=1)
+    city[tuple(i[evacuar] for i in cidades)] = EVACUATED
+
+
+def rejeitar_agentes_moveis(motor, **quantidades):
+    """
+    Levanta ValueError se algum agente móvel for pedido a um motor que só simula a paisagem.
+    Args:
+        motor: Nome do modelo, usado na mensagem.
+        quantidades: num_pessoas, num_helicoptero, ... com as quantidades recebidas.
+    """
+    pedidos = [f"{nome}={n}" for nome, n in quantidades.items() if n]
+    if pedidos:
+        raise ValueError(f"{motor} não simula agentes móveis ({', '.join(pedidos)}); "
+                         "passe 0 ou use o ForestFire com agentes")
+
+
+class VectorizedForestFire(mesa.Model):
+    """
+    Motor vetorizado do ForestFire.
+
+    Guarda a paisagem (árvores, grama e cidades) em arrays NumPy com os códigos de
+    `conditions` e aplica a propagação de TreeCell/GrassCell e a evacuação de
+    CityCell como operações sobre a grade inteira. Mantém a assinatura do
+    ForestFire, `step()`, `running`, `edge_reached` e as colunas do DataCollector.
+
+    Diferenças em relação ao ForestFire com agentes:
+      - a atualização é síncrona (as células incendiadas num passo só espalham o
+        fogo no passo seguinte), em vez da ordem aleatória do RandomActivation;
+      - só a paisagem e a chuva são simuladas: bombeiros, helicópteros, policiais,
+        bombardeiros e madeireiros ficam na assinatura com padrão 0, e quantidades
+        diferentes de 0 levantam ValueError;
+      - a chuva é um campo do modelo: cada nuvem continua ativa com probabilidade
+        FREQUENCIA_CHUVA por passo e, havendo alguma ativa, as regras da Chuva são
+        aplicadas uma vez a toda a grade.
+    """
+
+    def __init__(self, width=100, height=100, density=0.65, prob_de_sobrevivencia=0.0, vento="Norte", city_probability=0.01, grass_probability=0.05, num_pessoas=0, num_helicoptero=0, num_policiais=0, num_bombers=0, num_loggers=0, qtd_chuva = 20, seed=None, evacuation_radius=RAIO_EVACUACAO, sink=None, window=None, chunk_size=1024, recorder=None):
+        rejeitar_agentes_moveis(type(self).__name__, num_pessoas=num_pessoas, num_helicoptero=num_helicoptero, num_policiais=num_policiais, num_bombers=num_bombers, num_loggers=num_loggers)
+        super().__init__()
+
+        self.width = width
+        self.height = height
+        self.prob_de_sobrevivencia = prob_de_sobrevivencia
+        self.vento = vento
+        self.edge_reached = False
+        self.max_x_reached = -1
+        self.edges_reached = {"left": False, "right": False, "bottom": False, "top": False}
+        self.current_step = 0
+        self.active_rain = qtd_chuva
+        self.rng = np.random.default_rng(self.random.getrandbits(64))
+
+        self.datacollector = ColumnarDataCollector(
+            {
+                "Fine": lambda m: self.count_type(m, "Fine"),
+                "On Fire": lambda m: self.count_type(m, "On Fire"),
+                "Burned Out": lambda m: self.count_type(m, "Burned Out"),
+                "Cities Evacuated": lambda m: self.count_type(m, "Evacuated"),
+                "Fire Off": lambda m: self.count_type(m, "Fire Off"),
+                "Bombed": lambda m: self.count_type(m, "Bombed"),
+                "Cut": lambda m: self.count_type(m, "Cut"),
+                "BurnedFraction": lambda m: m.count_type(m, "Burned Out") / (m.width * m.height)
+            },
+            # sink: caminho (.csv, .parquet, .arrow) ou objeto de sinks.py para gravar os passos em disco
+            sink=open_sink(sink) if isinstance(sink, str) else sink,
+            window=window,
+            chunk_size=chunk_size,  # Linhas acumuladas antes de cada gravação no sink
+        )
+
+        shape = (width, height)
+        self.vegetation, self.condition, self.city = gerar_paisagem(self.rng, shape, density, city_probability, grass_probability)
+        # Passo da primeira ignição e do último fim do fogo de cada célula (-1 = nunca)
+        self._ignition_step = np.where(self.condition == ON_FIRE, 0, -1).astype(np.int32)
+        self._extinguish_step = np.full(shape, -1, dtype=np.int32)
+        self.evacuation_radius = evacuation_radius
+        self._raio_evacuacao = _offsets_do_raio(evacuation_radius)
+        self._fogo_alcancou(self.condition == ON_FIRE)
+
+        self.running = True
+        self._contar()
+        self.datacollector.collect(self)
+
+        # recorder: caminho ou HistoryRecorder; as mudanças de cada passo saem da comparação dos arrays
+        self.recorder = HistoryRecorder(recorder) if isinstance(recorder, str) else recorder
+        if self.recorder is not None:
+            self.recorder.start(self.vegetation, self.condition, self.city, [])
+
+    @property
+    def pure_percolation(self):
+        """
+        Verdadeiro quando o fogo sempre passa para todas as árvores vizinhas: sem chance de
+        sobrevivência (com prob_de_sobrevivencia = 0 o vento não muda nada), sem grama e sem chuva.
+        O estado final é então a camada de árvores ligadas às que queimam, e run_model o calcula direto.
+        """
+        return self.prob_de_sobrevivencia <= 0 and self.active_rain == 0 \
+            and not (self.vegetation == GRASS).any() and self.recorder is None
+
+    def run_model(self):
+        """
+        Roda o modelo até parar. Na percolação pura o estado final, as colunas do
+        DataCollector de todos os passos, edge_reached e os tempos de ignição são
+        calculados sem executar os passos, com o mesmo resultado de `step()`. No fim o sink e o
+        recorder são fechados.
+        """
+        try:
+            if self.running and self.pure_percolation:
+                self._resolver_percolacao()
+            while self.running:
+                self.step()
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Grava no sink as linhas pendentes e fecha o sink e o recorder. É chamado ao fim da
+        execução e por run_model; quem para o modelo antes (max_steps, batch_run, servidor)
+        deve chamá-lo ou usar o modelo num bloco `with`. Pode ser chamado mais de uma vez.
+        """
+        self.datacollector.close()
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _resolver_percolacao(self):
+        queimando = self.condition == ON_FIRE
+        tempos = burn_times((self.vegetation == TREE) & ((self.condition == FINE) | queimando), queimando)
+        # Passo em que cada árvore fica em chamas (camada da busca em largura a partir do passo atual)
+        t0 = self.current_step
+        camada = np.where(tempos >= 0, tempos + t0, -1)
+
+        # Último passo: o primeiro em que não há fogo ou em que o fogo chega à última coluna
+        fim = int(camada.max()) + 1
+        direita = camada[-1][camada[-1] > t0]
+        if direita.size:
+            fim = min(fim, int(direita.min()))
+        fim = max(fim, t0 + 1)
+        tamanhos = np.bincount(camada[camada >= 0], minlength=fim + 1)
+
+        # Cidades: evacuadas no primeiro passo com fogo dentro do raio
+        cx, cy = np.nonzero(self.city == CITY)
+        evacuacao = np.zeros(0, dtype=np.int64)
+        if cx.size:
+            r = math.ceil(self.evacuation_radius)
+            chegada = np.pad(np.where(camada > t0, camada, np.iinfo(np.int32).max), r,
+                             constant_values=np.iinfo(np.int32).max)
+            evacuacao = chegada[cx[:, None] + r + self._raio_evacuacao[:, 0],
+                                cy[:, None] + r + self._raio_evacuacao[:, 1]].min(axis=1)
+
+        contagens = self.contagens.copy()
+        for t in range(t0 + 1, fim + 1):
+            self.current_step = t
+            self.contagens = contagens.copy()
+            self.contagens[FINE] -= tamanhos[t0 + 1:t + 1].sum()
+            self.contagens[ON_FIRE] = tamanhos[t]
+            self.contagens[BURNED_OUT] += tamanhos[t0:t].sum()
+            evacuadas = int(np.count_nonzero(evacuacao <= t))
+            self.contagens[CITY] -= evacuadas
+            self.contagens[EVACUATED] += evacuadas
+            self.datacollector.collect(self)
+
+        # Estado final
+        alcancadas = (camada >= 0) & (camada <= fim)
+        self.condition[alcancadas & (camada < fim)] = BURNED_OUT
+        self.condition[camada == fim] = ON_FIRE
+        if cx.size:
+            evacuar = evacuacao <= fim
+            self.city[cx[evacuar], cy[evacuar]] = EVACUATED
+        novas = alcancadas & (camada > t0)
+        self._ignition_step[novas] = camada[novas]
+        self._extinguish_step[alcancadas & (camada < fim)] = camada[alcancadas & (camada < fim)] + 1
+        self._fogo_alcancou(novas)
+        self._contar()
+
+        self.running = False
+
+    def step(self):
+        """
+        Avança o modelo por um passo.
+        """
+        self.current_step += 1
+        self.active_rain = self.rng.binomial(self.active_rain, FREQUENCIA_CHUVA)
+        if self.active_rain > 0:
+            em_chamas = self.condition == ON_FIRE
+            aplicar_chuva(self.vegetation, self.condition, self.city)
+            self._extinguish_step[em_chamas & (self.condition != ON_FIRE)] = self.current_step
+        # Todas as células em chamas antes da propagação terminam o passo queimadas
+        self._extinguish_step[self.condition == ON_FIRE] = self.current_step
+        novas = espalhar_fogo(self.vegetation, self.condition, self.rng, self.prob_de_sobrevivencia, self.vento)
+        self._ignition_step[novas & (self._ignition_step < 0)] = self.current_step
+        self._fogo_alcancou(novas)
+        self._evacuar_cidades()
+        if self.recorder is not None:
+            self.recorder.end_step(self.current_step, [], self.condition, self.city)
+
+        # Coleta dados
+        self._contar()
+        self.datacollector.collect(self)
+
+        if self.count_type(self, "On Fire") == 0 or self.edge_reached:
+            self.running = False
+            # Fim da execução: grava no sink as linhas que faltam
+            self.close()
+
+    @property
+    def ignition_step(self):
+        """Array (width, height) somente leitura com o passo da primeira ignição de cada célula (-1 = nunca)."""
+        view = self._ignition_step.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def extinguish_step(self):
+        """Array (width, height) somente leitura com o último passo em que o fogo de cada célula acabou (-1 = nunca)."""
+        view = self._extinguish_step.view()
+        view.flags.writeable = False
+        return view
+
+    def _fogo_alcancou(self, novas):
+        """Atualiza o alcance do fogo com as árvores incendiadas neste passo."""
+        novas = novas & (self.vegetation == TREE)
+        colunas = np.flatnonzero(novas.any(axis=1))
+        if colunas.size == 0:
+            return
+        self.max_x_reached = max(self.max_x_reached, int(colunas[-1]))
+        self.edges_reached["left"] |= bool(colunas[0] == 0)
+        self.edges_reached["right"] |= bool(colunas[-1] == self.width - 1)
+        self.edges_reached["bottom"] |= bool(novas[:, 0].any())
+        self.edges_reached["top"] |= bool(novas[:, -1].any())
+        self.edge_reached = self.edges_reached["right"]
+
+    def _evacuar_cidades(self):
+        """Evacua as cidades com alguma célula em chamas dentro do raio de evacuação."""
+        evacuar_cidades(self.city, self.condition, self.evacuation_radius, self._raio_evacuacao)
+
+    def _contar(self):
+        """Conta as condições da grade numa única passada."""
+        self.contagens = np.bincount(self.condition.ravel(), minlength=len(CONDITION_CODES) + 1) \
+            + np.bincount(self.city.ravel(), minlength=len(CONDITION_CODES) + 1)
+
+    @staticmethod
+    def count_type(model, condition):
+        return int(model.contagens[CONDITION_CODES[condition]])